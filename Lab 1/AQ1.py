@@ -1,3 +1,9 @@
+import sys
+import time
+import numpy as np
+from question6 import ENGLISH_FREQ
+from fitness import load_table, score_batch, tables_available
+
 letter_to_num = {ch: i for i, ch in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}
 num_to_letter = {i: ch for i, ch in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}
 
@@ -15,11 +21,103 @@ def additive_decrypt(ciphertext, key):
             plaintext += ch
     return plaintext
 
-ciphertext = "NCJAEZRCLAS/LYODEPRLYZRCLASJLCPEHZDTOPDZOLN&BY"
+# Every shift of a byte buffer at once, shape (26, n): row k is the buffer
+# decrypted with key k. Case and non-letters are kept as additive_decrypt does.
+def all_shifts(data):
+    upper = (data >= ord('A')) & (data <= ord('Z'))
+    lower = (data >= ord('a')) & (data <= ord('z'))
+    base = np.where(lower, ord('a'), ord('A'))
+    shifted = (data[None, :] - base - np.arange(26)[:, None]) % 26 + base
+    return np.where(upper | lower, shifted, data[None, :]).astype(np.uint8)
+
+# Chi-squared against English for each text (rows of counts) under each key.
+# Decrypting with key k turns ciphertext letter x + k into x, so the
+# plaintext histogram is the ciphertext histogram rotated by k.
+def shift_scores(counts):
+    idx = (np.arange(26)[:, None] + np.arange(26)[None, :]) % 26
+    observed = counts[:, idx]
+    expected = ENGLISH_FREQ * counts.sum(axis=1)[:, None, None]
+    expected = np.maximum(expected, 1e-9)
+    return (((observed - expected) ** 2) / expected).sum(axis=2)
+
+def letter_codes(data):
+    letters = data | 0x20
+    mask = (letters >= ord('a')) & (letters <= ord('z'))
+    return mask, letters - ord('a')
+
+# Ranked by chi-squared (lower is better), or by quadgram fitness of the 26
+# candidate texts scored as one 2-D batch (higher is better) given a table
+def rank_shifts(ciphertext, table=None):
+    data = np.frombuffer(ciphertext.encode('utf-8'), dtype=np.uint8).astype(np.int64)
+    mask, codes = letter_codes(data)
+    plains = all_shifts(data)
+    if table is None:
+        counts = np.bincount(codes[mask], minlength=26)[None, :]
+        scores = shift_scores(counts)[0]
+        order = np.argsort(scores)
+    else:
+        scores = score_batch(letter_codes(plains[:, mask])[1], table=table)
+        order = np.argsort(-scores)
+    return [(float(scores[key]), int(key), plains[key].tobytes().decode('utf-8'))
+            for key in order]
+
+# Crack many independent ciphertexts in one call: one bincount over the
+# concatenated buffer gives every text's histogram, and each byte is then
+# decrypted with the best key of the text it belongs to.
+def crack_batch(ciphertexts):
+    if not ciphertexts:
+        return []
+    encoded = [text.encode('utf-8') for text in ciphertexts]
+    lengths = np.array([len(e) for e in encoded])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+    segment = np.repeat(np.arange(len(encoded)), lengths)
+    mask, codes = letter_codes(data)
+    counts = np.bincount(segment[mask] * 26 + codes[mask], minlength=26 * len(encoded)).reshape(-1, 26)
+    scores = shift_scores(counts)
+    best = np.argmin(scores, axis=1)
+
+    upper = (data >= ord('A')) & (data <= ord('Z'))
+    base = np.where(upper, ord('A'), ord('a'))
+    plain = np.where(mask, (data - base - best[segment]) % 26 + base, data).astype(np.uint8).tobytes()
+
+    results = []
+    offset = 0
+    for i, length in enumerate(lengths):
+        results.append((int(best[i]), float(scores[i, best[i]]), plain[offset:offset+length].decode('utf-8')))
+        offset += length
+    return results
+
+def benchmark(count=10_000):
+    sample = "Meet me after the lecture, the lab notes are under the third desk"
+    texts = [additive_decrypt(sample[:20 + i % 40], -(i % 26)) for i in range(count)]
+    start = time.perf_counter()
+    results = crack_batch(texts)
+    elapsed = time.perf_counter() - start
+    correct = sum(key == i % 26 for i, (key, _, _) in enumerate(results))
+    print(f"{count} ciphertexts in {elapsed * 1000:.1f} ms, {correct} keys correct")
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+    ciphertext = "NCJAEZRCLAS/LYODEPRLYZRCLASJLCPEHZDTOPDZOLN&BY"
+
+    print("Trying keys near 13 (8 to 18):\n")
+    for key in range(8, 19):
+        decrypted = additive_decrypt(ciphertext, key)
+        print(f"Key = {key}:")
+        print(decrypted)
+        print()
+
+    print("Ranked by letter frequency:\n")
+    for score, key, plaintext in rank_shifts(ciphertext)[:3]:
+        print(f"Key = {key} (chi2 = {score:.1f}):")
+        print(plaintext)
+        print()
 
-print("Trying keys near 13 (8 to 18):\n")
-for key in range(8, 19):
-    decrypted = additive_decrypt(ciphertext, key)
-    print(f"Key = {key}:")
-    print(decrypted)
-    print()
+    if tables_available():
+        print("Ranked by quadgram fitness:\n")
+        for score, key, plaintext in rank_shifts(ciphertext, load_table(4))[:3]:
+            print(f"Key = {key} (fitness = {score:.1f}):")
+            print(plaintext)
+            print()
@@ -1,3 +1,7 @@
+import sys
+import time
+import numpy as np
+
 letter_to_num = {ch: i for i, ch in enumerate('abcdefghijklmnopqrstuvwxyz')}
 num_to_letter = {i: ch for i, ch in enumerate('abcdefghijklmnopqrstuvwxyz')}
 
@@ -18,8 +22,75 @@ def vigenere_encrypt(plaintext, keyword):
             ciphertext.append(ch)
     return ''.join(ciphertext)
 
-message = "Life is full of surprises"
-keyword = "HEALTH"
+# Pack byte strings into a zero-padded (rows x longest) matrix in one scatter
+def pack(encoded):
+    lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+    starts = np.cumsum(lengths) - lengths
+    flat = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(encoded)), lengths)
+    cols = np.arange(len(flat)) - np.repeat(starts, lengths)
+    matrix = np.zeros((len(encoded), max(lengths.max(initial=0), 1)), dtype=np.uint8)
+    matrix[rows, cols] = flat
+    return matrix, lengths
+
+# Rows the vectorised path cannot reproduce: a keyword that is empty or not
+# all a-z, or a message with a letter outside a-z such as é or ß. These go
+# through vigenere_encrypt, so they fail (or succeed) exactly as it does.
+def scalar_rows(messages, keywords):
+    bad = {k for k in set(keywords) if not k or any(ch not in letter_to_num for ch in k.lower())}
+    if not bad and all(m.isascii() for m in messages):
+        return []
+    return [i for i, (m, k) in enumerate(zip(messages, keywords))
+            if k in bad or (not m.isascii() and any(ch.isalpha() and ch not in letter_to_num for ch in m.lower()))]
+
+# Encrypt many (message, keyword) pairs at once. Messages are packed into a
+# padded matrix and each keyword is tiled across its row: a letter's key
+# position is the running count of letters in its row, so non-letters pass
+# through and do not advance the key, exactly as in vigenere_encrypt.
+def vigenere_encrypt_batch(messages, keywords):
+    rows = scalar_rows(messages, keywords)
+    if rows:
+        results = {i: vigenere_encrypt(messages[i], keywords[i]) for i in rows}
+        rest = [i for i in range(len(messages)) if i not in results]
+        fast = vigenere_encrypt_batch([messages[i] for i in rest], [keywords[i] for i in rest])
+        results.update(zip(rest, fast))
+        return [results[i] for i in range(len(messages))]
+    data, lengths = pack([m.lower().encode('utf-8') for m in messages])
+    key_matrix, key_lengths = pack([k.lower().encode('ascii') for k in keywords])
+    shifts_table = key_matrix.astype(np.int64) - ord('a')
+
+    letters = (data >= ord('a')) & (data <= ord('z'))
+    position = np.cumsum(letters, axis=1) - 1
+    rows = np.arange(len(data))[:, None]
+    shifts = shifts_table[rows, position % np.maximum(key_lengths, 1)[:, None]]
+    out = np.where(letters, (data - ord('a') + shifts) % 26 + ord('a'), data).astype(np.uint8)
+
+    flat = out[np.arange(out.shape[1])[None, :] < lengths[:, None]].tobytes()
+    ends = np.cumsum(lengths)
+    return [flat[end - length:end].decode('utf-8') for end, length in zip(ends.tolist(), lengths.tolist())]
+
+def benchmark(count=100_000):
+    records = ["Patient %d: blood pressure normal, follow up in %d weeks" % (i, i % 12) for i in range(count)]
+    keys = ["HEALTH", "CARDIO", "WARDA", "SECRET"]
+    keywords = [keys[i % len(keys)] for i in range(count)]
+
+    start = time.perf_counter()
+    slow = [vigenere_encrypt(m, k) for m, k in zip(records, keywords)]
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = vigenere_encrypt_batch(records, keywords)
+    batch = time.perf_counter() - start
+
+    assert slow == fast
+    print(f"{count} records: scalar {scalar:.3f} s, batch {batch:.3f} s ({scalar / batch:.1f}x)")
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+    message = "Life is full of surprises"
+    keyword = "HEALTH"
 
-ciphertext = vigenere_encrypt(message, keyword)
-print(ciphertext)
+    ciphertext = vigenere_encrypt(message, keyword)
+    print(ciphertext)
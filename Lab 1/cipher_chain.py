@@ -0,0 +1,116 @@
+import sys
+import time
+from math import gcd
+import numpy as np
+from question1 import affine_encrypt, additive_encrypt, mod_inverse, multiplicative_encrypt, affine_table
+from question2 import encrypt_vigenere
+
+# Every stage handled here is a periodic affine map on letters: the letter at
+# position i becomes a*x + b[i % period] (mod 26). Additive, multiplicative
+# and affine ciphers have period 1 and Vigenere has a = 1. Applying one such
+# map after another is again one, so a whole chain fuses into a single map
+# before any data is touched.
+class PeriodicAffine:
+    def __init__(self, a, offsets):
+        if gcd(a, 26) != 1:
+            raise ValueError(f"Key {a} has no inverse mod 26")
+        self.a = a % 26
+        self.offsets = [b % 26 for b in offsets]
+
+    @property
+    def period(self):
+        return len(self.offsets)
+
+    def then(self, other):
+        period = self.period * other.period // gcd(self.period, other.period)
+        offsets = [other.a * self.offsets[i % self.period] + other.offsets[i % other.period]
+                   for i in range(period)]
+        return PeriodicAffine(self.a * other.a, offsets)
+
+    def inverse(self):
+        a_inverse = mod_inverse(self.a, 26)
+        return PeriodicAffine(a_inverse, [-a_inverse * b for b in self.offsets])
+
+    # One 256-entry table per position in the period, same byte mapping as
+    # question1.affine_table
+    def tables(self):
+        return np.array([np.frombuffer(affine_table(self.a, b), dtype=np.uint8) for b in self.offsets])
+
+    # start is the position of data[0] in the whole message, so a long input
+    # can be processed in pieces
+    def apply(self, data, start=0):
+        data = bytes(data)
+        if self.period == 1:
+            return data.translate(affine_table(self.a, self.offsets[0]))
+        tables = np.roll(self.tables(), -(start % self.period), axis=0)
+        buf = np.frombuffer(data, dtype=np.uint8)
+        rows = -(-len(buf) // self.period)
+        padded = np.zeros(rows * self.period, dtype=np.uint8)
+        padded[:len(buf)] = buf
+        out = tables[np.arange(self.period)[None, :], padded.reshape(rows, self.period)]
+        return out.ravel()[:len(buf)].tobytes()
+
+    def apply_text(self, text):
+        return self.apply(text.encode('latin-1')).decode('ascii')
+
+
+def additive(key):
+    return PeriodicAffine(1, [key])
+
+def multiplicative(key):
+    return PeriodicAffine(key, [0])
+
+def affine(a, b):
+    return PeriodicAffine(a, [b])
+
+def vigenere(key):
+    return PeriodicAffine(1, [ord(k) - ord('A') for k in key.upper()])
+
+
+# Fuse the stages in the order they are applied
+def compile_chain(stages):
+    fused = stages[0]
+    for stage in stages[1:]:
+        fused = fused.then(stage)
+    return fused
+
+
+CHAINS = {
+    3: ([additive(20), multiplicative(15), affine(15, 20)],
+        lambda t: affine_encrypt(multiplicative_encrypt(additive_encrypt(t, 20), 15), 15, 20)),
+    5: ([additive(7), vigenere("DOLLARS"), multiplicative(5), vigenere("LEMON"), affine(11, 3)],
+        lambda t: affine_encrypt(encrypt_vigenere(multiplicative_encrypt(
+            encrypt_vigenere(additive_encrypt(t, 7), "DOLLARS"), 5), "LEMON"), 11, 3)),
+}
+
+
+def benchmark(size_mb=2):
+    n = int(size_mb * 1024 * 1024)
+    text = ("IAMLEARNINGINFORMATIONSECURITY" * (n // 30 + 1))[:n]
+    print(f"{'Stages':>6} {'staged MB/s':>12} {'fused MB/s':>11} {'speedup':>9}")
+    for count, (stages, staged) in CHAINS.items():
+        start = time.perf_counter()
+        slow = staged(text)
+        staged_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = compile_chain(stages).apply_text(text)
+        fused_time = time.perf_counter() - start
+
+        assert slow == fast
+        print(f"{count:>6} {size_mb / staged_time:>12.2f} {size_mb / fused_time:>11.2f} "
+              f"{staged_time / fused_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+    plaintext = "I am learning information security".replace(" ", "").upper()
+    for count, (stages, staged) in CHAINS.items():
+        fused = compile_chain(stages)
+        encrypted = fused.apply_text(plaintext)
+        print(f"{count} stages -> a = {fused.a}, period = {fused.period}")
+        print("Encrypted :", encrypted)
+        print("Staged    :", staged(plaintext))
+        print("Decrypted :", fused.inverse().apply_text(encrypted))
@@ -0,0 +1,143 @@
+import argparse
+import mmap
+import os
+import time
+from multiprocessing import Pool, cpu_count
+import numpy as np
+from question1 import affine_table
+from cipher_chain import vigenere
+
+WINDOW = 1 << 24
+
+
+# Each cipher transforms one window given its byte offset in the file.
+# Stateless ciphers only need the offset, so any byte range can be done on
+# its own; the others carry state from one window to the next.
+class AffineCipher:
+    stateless = True
+
+    def __init__(self, a, b, decrypt=False):
+        self.table = affine_table(a, b, decrypt)
+
+    def update(self, chunk, offset):
+        return bytes(chunk).translate(self.table)
+
+
+# question2's Vigenere advances the key on every byte, so the key position
+# is just the file offset
+class VigenereCipher:
+    stateless = True
+
+    def __init__(self, key, decrypt=False):
+        self.map = vigenere(key).inverse() if decrypt else vigenere(key)
+
+    def update(self, chunk, offset):
+        return self.map.apply(chunk, start=offset)
+
+
+# AQ2's Vigenere lowercases, passes non-letters through and only advances the
+# key on letters, so the number of letters seen so far is carried across
+# windows
+class LetterVigenereCipher:
+    stateless = False
+
+    def __init__(self, keyword, decrypt=False):
+        shifts = np.frombuffer(keyword.lower().encode('ascii'), dtype=np.uint8).astype(np.int64) - ord('a')
+        self.shifts = -shifts if decrypt else shifts
+        self.letters_seen = 0
+
+    def update(self, chunk, offset):
+        data = np.frombuffer(bytes(chunk), dtype=np.uint8)
+        upper = (data >= ord('A')) & (data <= ord('Z'))
+        data = np.where(upper, data | 0x20, data)
+        letters = (data >= ord('a')) & (data <= ord('z'))
+        position = self.letters_seen + np.cumsum(letters) - 1
+        shift = self.shifts[position % len(self.shifts)]
+        out = np.where(letters, (data.astype(np.int64) - ord('a') + shift) % 26 + ord('a'), data)
+        self.letters_seen += int(letters.sum())
+        return out.astype(np.uint8).tobytes()
+
+
+def make_cipher(name, key, decrypt=False):
+    if name == "additive":
+        return AffineCipher(1, int(key), decrypt)
+    elif name == "multiplicative":
+        return AffineCipher(int(key), 0, decrypt)
+    elif name == "affine":
+        a, b = (int(x) for x in key.split(","))
+        return AffineCipher(a, b, decrypt)
+    elif name == "vigenere":
+        return VigenereCipher(key, decrypt)
+    elif name == "aq2-vigenere":
+        return LetterVigenereCipher(key, decrypt)
+    raise ValueError(f"Unknown cipher: {name}")
+
+
+def open_output(out_path, size):
+    with open(out_path, "wb") as dst:
+        dst.truncate(size)
+
+
+# Transform bytes [start, end) through memory maps of both files
+def transform_range(in_path, out_path, cipher, start, end, window=WINDOW):
+    with open(in_path, "rb") as src, open(out_path, "r+b") as dst:
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as m_in, \
+                mmap.mmap(dst.fileno(), 0) as m_out:
+            for offset in range(start, end, window):
+                stop = min(offset + window, end)
+                m_out[offset:stop] = cipher.update(m_in[offset:stop], offset)
+
+
+def transform_file(in_path, out_path, cipher, window=WINDOW):
+    size = os.path.getsize(in_path)
+    open_output(out_path, size)
+    if size:
+        transform_range(in_path, out_path, cipher, 0, size, window)
+
+
+def transform_job(job):
+    transform_range(*job)
+
+
+# Stateless ciphers only: split the file into byte ranges and let a process
+# pool write each range straight into the shared output map
+def transform_file_parallel(in_path, out_path, cipher, workers=None, window=WINDOW):
+    if not cipher.stateless:
+        raise ValueError("This cipher carries state between windows; use transform_file")
+    size = os.path.getsize(in_path)
+    open_output(out_path, size)
+    if not size:
+        return
+    workers = workers or cpu_count()
+    step = max(window, -(-size // workers))
+    jobs = [(in_path, out_path, cipher, start, min(start + step, size), window)
+            for start in range(0, size, step)]
+    with Pool(workers) as pool:
+        pool.map(transform_job, jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped file mode for the Lab 1 ciphers")
+    parser.add_argument("cipher", choices=["additive", "multiplicative", "affine", "vigenere", "aq2-vigenere"])
+    parser.add_argument("key", help="integer key, 'a,b' for affine, or a keyword")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--decrypt", action="store_true")
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--window", type=int, default=WINDOW)
+    args = parser.parse_args()
+
+    cipher = make_cipher(args.cipher, args.key, args.decrypt)
+    start = time.perf_counter()
+    if args.parallel:
+        transform_file_parallel(args.input, args.output, cipher, args.workers, args.window)
+    else:
+        transform_file(args.input, args.output, cipher, args.window)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.input) / (1024 * 1024)
+    print(f"{size_mb:.1f} MB in {elapsed:.2f} s ({size_mb / max(elapsed, 1e-9):.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import os
+import time
+import numpy as np
+
+# English n-gram log10 probabilities, one flat float32 array per n indexed by
+# the base-26 code of the n-gram (AAAA = 0, AAAB = 1, ...). Tables are built
+# once from a corpus, saved as .npy files and memory-mapped on first use, so
+# importing this module or starting a scorer costs next to nothing.
+TABLE_DIR = os.environ.get("LAB1_NGRAM_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "ngrams"))
+NAMES = {3: "trigrams", 4: "quadgrams"}
+FLOOR = 0.01
+TABLES = {}
+
+
+# Tables trained with J folded into I (for Playfair, whose plaintext never
+# contains J) are saved next to the plain ones with a _fold_j suffix
+def table_path(n, table_dir=None, fold_j=False):
+    suffix = "_fold_j" if fold_j else ""
+    return os.path.join(table_dir or TABLE_DIR, NAMES[n] + suffix + ".npy")
+
+
+def text_to_codes(text, fold_j=False):
+    text = text.upper()
+    if fold_j:
+        text = text.replace('J', 'I')
+    data = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+    return (data[(data >= ord('A')) & (data <= ord('Z'))] - ord('A')).astype(np.int64)
+
+
+# Base-26 codes of every n-gram along the last axis, so a 2-D batch of
+# candidate texts gives one row of codes per candidate
+def ngram_codes(nums, n=4):
+    length = nums.shape[-1] - n + 1
+    codes = np.zeros(nums.shape[:-1] + (max(length, 0),), dtype=np.int64)
+    for i in range(n):
+        codes = codes * 26 + nums[..., i:i + length]
+    return codes
+
+
+def build_table(nums, n=4):
+    counts = np.bincount(ngram_codes(nums, n), minlength=26 ** n)
+    return np.log10(np.maximum(counts, FLOOR) / max(counts.sum(), 1)).astype(np.float32)
+
+
+def corpus_codes(corpus_path, fold_j=False):
+    with open(corpus_path, errors='ignore') as f:
+        return text_to_codes(f.read(), fold_j)
+
+
+def build_tables(corpus_path, table_dir=None, sizes=(3, 4)):
+    os.makedirs(table_dir or TABLE_DIR, exist_ok=True)
+    for fold_j in (False, True):
+        nums = corpus_codes(corpus_path, fold_j)
+        for n in sizes:
+            np.save(table_path(n, table_dir, fold_j), build_table(nums, n))
+
+
+def load_table(n=4, table_dir=None, fold_j=False):
+    key = (n, table_dir, fold_j)
+    if key not in TABLES:
+        TABLES[key] = np.load(table_path(n, table_dir, fold_j), mmap_mode='r')
+    return TABLES[key]
+
+
+def tables_available(n=4, table_dir=None, fold_j=False):
+    return os.path.exists(table_path(n, table_dir, fold_j))
+
+
+# Mean log10 probability per n-gram of text drawn from the table's own
+# distribution; real English scores close to this, random text far below
+def expected_score(table):
+    table = np.asarray(table, dtype=np.float64)
+    return float((10.0 ** table * table).sum())
+
+
+def score(text, n=4, table=None):
+    nums = text_to_codes(text) if isinstance(text, str) else np.asarray(text)
+    table = load_table(n) if table is None else table
+    return float(table[ngram_codes(nums, n)].sum())
+
+
+# Candidates as a 2-D array of letter codes (0..25), one candidate per row
+def score_batch(candidates, n=4, table=None):
+    table = load_table(n) if table is None else table
+    return table[ngram_codes(np.asarray(candidates), n)].sum(axis=-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="English n-gram fitness tables")
+    parser.add_argument("command", choices=["build", "score"])
+    parser.add_argument("arg", help="corpus path for build, text for score")
+    parser.add_argument("--dir", default=None, help="table directory (default: %s)" % TABLE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        build_tables(args.arg, args.dir)
+        print(f"Tables written to {args.dir or TABLE_DIR} in {time.perf_counter() - start:.2f} s")
+    else:
+        start = time.perf_counter()
+        table = load_table(4, args.dir)
+        loaded = time.perf_counter() - start
+        nums = text_to_codes(args.arg)
+        value = score(nums, 4, table)
+        print(f"Loaded in {loaded * 1000:.2f} ms")
+        print(f"Quadgram score: {value:.2f} ({value / max(len(nums) - 3, 1):.3f} per quadgram, "
+              f"English ~ {expected_score(table):.3f})")
+
+
+if __name__ == "__main__":
+    main()
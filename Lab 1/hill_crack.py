@@ -0,0 +1,210 @@
+import argparse
+import time
+from multiprocessing import Pool, cpu_count
+import numpy as np
+from question4 import clean_text, hill_decrypt, hill_encrypt, mod_matrix_inverse
+from question6 import ENGLISH_FREQ
+from fitness import build_table, corpus_codes, load_table, ngram_codes, tables_available
+
+
+def text_blocks(text, n):
+    data = np.frombuffer(clean_text(text, n).encode('ascii'), dtype=np.uint8)
+    return (data.astype(np.int64) - ord('A')).reshape(-1, n)
+
+
+# Greedily pick blocks that are linearly independent over GF(p)
+def independent_blocks(blocks, p):
+    basis = []
+    chosen = []
+    for idx, block in enumerate(blocks):
+        v = [int(x) % p for x in block]
+        for pivot, row in basis:
+            if v[pivot]:
+                factor = v[pivot]
+                v = [(a - factor * b) % p for a, b in zip(v, row)]
+        pivot = next((i for i, x in enumerate(v) if x), None)
+        if pivot is None:
+            continue
+        inverse = pow(v[pivot], -1, p)
+        basis.append((pivot, [(x * inverse) % p for x in v]))
+        chosen.append(idx)
+        if len(chosen) == blocks.shape[1]:
+            break
+    return chosen
+
+
+# Gauss-Jordan inverse over GF(p)
+def inverse_mod_prime(matrix, p):
+    n = len(matrix)
+    aug = [[int(x) % p for x in row] + [int(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = next(r for r in range(col, n) if aug[r][col])
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        inverse = pow(aug[col][col], -1, p)
+        aug[col] = [(x * inverse) % p for x in aug[col]]
+        for r in range(n):
+            if r != col and aug[r][col]:
+                factor = aug[r][col]
+                aug[r] = [(a - factor * b) % p for a, b in zip(aug[r], aug[col])]
+    return np.array([row[n:] for row in aug], dtype=np.int64)
+
+
+# K P = C holds mod 26, so it holds mod 2 and mod 13, which are fields. Solve
+# both with whichever blocks are independent there (they need not be the same
+# blocks, and no single subset has to be invertible mod 26), then join by CRT.
+def recover_key(pairs, n):
+    P = np.vstack([text_blocks(plain, n) for plain, _ in pairs])
+    C = np.vstack([text_blocks(cipher, n) for _, cipher in pairs])
+    if P.shape != C.shape:
+        raise ValueError("Crib plaintext and ciphertext lengths do not match")
+
+    parts = {}
+    for p in (2, 13):
+        idx = independent_blocks(P, p)
+        if len(idx) < n:
+            raise ValueError(f"Crib blocks do not span the key space mod {p}")
+        parts[p] = (C[idx].T @ inverse_mod_prime(P[idx].T, p)) % p
+
+    key = (13 * parts[2] + 14 * parts[13]) % 26
+    if not ((key @ P.T) % 26 == C.T).all():
+        raise ValueError("Crib is not consistent with any Hill key")
+    return key
+
+
+# A row that can appear in an invertible matrix mod 26 cannot be all even or
+# all multiples of 13
+def valid_rows(rows):
+    return ((rows % 2).any(axis=1)) & ((rows % 13).any(axis=1))
+
+
+def index_to_rows(idx, n):
+    return (idx[:, None] // 26 ** np.arange(n)[None, :]) % 26
+
+
+# Worker: chi-squared score of every candidate decryption row in [start, stop).
+# Row r of the inverse key produces every n-th plaintext letter on its own,
+# so rows can be rated independently: n * 26^n work instead of 26^(n*n).
+def score_rows(job):
+    start, stop, C, top = job
+    rows = index_to_rows(np.arange(start, stop), C.shape[1])
+    rows = rows[valid_rows(rows)]
+    streams = (rows @ C.T) % 26
+    offsets = 26 * np.arange(len(rows))[:, None]
+    counts = np.bincount((streams + offsets).ravel(), minlength=26 * len(rows)).reshape(-1, 26)
+    expected = ENGLISH_FREQ * C.shape[0]
+    scores = (((counts - expected) ** 2) / expected).sum(axis=1)
+    order = np.argsort(scores)[:top]
+    return scores[order], rows[order]
+
+
+def is_invertible(matrix):
+    det = int(round(np.linalg.det(matrix))) % 26
+    return det % 2 != 0 and det % 13 != 0
+
+
+# Log10 bigram probabilities, marginalised from the quadgram table
+def bigram_table(table):
+    return np.log10((10.0 ** table.astype(np.float64)).reshape(676, 676).sum(axis=1))
+
+
+# Order the best rows: pair_scores[a, b] rates row b directly after row a by
+# the bigrams they form in every block, and a beam search over those pairs
+# gives the most likely orderings. Only the final candidates are scored on
+# the full text with quadgrams.
+def assemble_key(rows, C, table, beam=200):
+    n = C.shape[1]
+    streams = (rows @ C.T) % 26
+    bigrams = bigram_table(table)
+    pair_scores = bigrams[26 * streams[:, None, :] + streams[None, :, :]].sum(axis=2)
+
+    paths = [((i,), 0.0) for i in range(len(rows))]
+    for _ in range(n - 1):
+        extended = [(path + (j,), score + pair_scores[path[-1], j])
+                    for path, score in paths for j in range(len(rows)) if j not in path]
+        paths = sorted(extended, key=lambda item: -item[1])[:beam]
+
+    best_score, best_inverse = -np.inf, None
+    for path, _ in paths:
+        inverse = rows[list(path)]
+        if not is_invertible(inverse):
+            continue
+        plain = ((inverse @ C.T) % 26).T.ravel()
+        score = table[ngram_codes(plain)].sum()
+        if score > best_score:
+            best_score, best_inverse = score, inverse
+    return best_inverse
+
+
+# Ciphertext-only: rank rows across a process pool, then assemble the best
+# rows into the most English-looking invertible inverse key
+def crack_hill(ciphertext, n, table, top=None, workers=None, chunk=1 << 15):
+    C = text_blocks(ciphertext, n)
+    top = top or 8 * n
+    jobs = [(start, min(start + chunk, 26 ** n), C, top) for start in range(0, 26 ** n, chunk)]
+
+    start = time.perf_counter()
+    with Pool(workers or cpu_count()) as pool:
+        results = pool.map(score_rows, jobs)
+    scores = np.concatenate([s for s, _ in results])
+    rows = np.vstack([r for _, r in results])
+    best_rows = rows[np.argsort(scores)[:top]]
+    row_time = time.perf_counter() - start
+
+    best_inverse = assemble_key(best_rows, C, table)
+    if best_inverse is None:
+        return None
+    key = mod_matrix_inverse(best_inverse)
+    return {
+        "key": key,
+        "plaintext": hill_decrypt(ciphertext, key),
+        "rows_per_sec": 26 ** n / row_time,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+DEMO_TEXT = """
+Cryptanalysis of the Hill cipher is easy once enough plaintext is known, since
+the cipher is completely linear. Without a crib the attacker can still use the
+fact that each row of the inverse key produces every nth letter of the message
+on its own, and those letters should follow the usual frequencies of English.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hill cipher key recovery")
+    parser.add_argument("--corpus", help="English text to train quadgrams from (default: saved fitness tables)")
+    parser.add_argument("-n", type=int, default=3, help="key size")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    keys = {
+        2: np.array([[3, 3], [2, 7]]),
+        3: np.array([[6, 24, 1], [13, 16, 10], [20, 17, 15]]),
+        4: np.array([[18, 24, 22, 13], [24, 25, 25, 2], [11, 15, 7, 9], [16, 20, 15, 4]]),
+    }
+    key = keys[args.n]
+    ciphertext = hill_encrypt(DEMO_TEXT, key)
+    print("Ciphertext:", ciphertext)
+
+    crib = DEMO_TEXT[:60]
+    found = recover_key([(crib, hill_encrypt(crib, key))], args.n)
+    print("Known-plaintext key:", found.tolist(), "correct:", (found == key).all())
+
+    table = None
+    if args.corpus:
+        table = build_table(corpus_codes(args.corpus))
+    elif tables_available():
+        table = load_table(4)
+
+    if table is not None:
+        result = crack_hill(ciphertext, args.n, table, workers=args.workers)
+        if result is None:
+            print("No invertible key among the best rows")
+            return
+        print("Ciphertext-only key:", result["key"].tolist(), "correct:", (result["key"] == key).all())
+        print("Plaintext:", result["plaintext"])
+        print(f"{result['rows_per_sec']:,.0f} rows/sec, {result['seconds']:.2f} s total")
+
+
+if __name__ == "__main__":
+    main()
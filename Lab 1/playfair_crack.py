@@ -0,0 +1,251 @@
+import argparse
+import time
+from multiprocessing import Pool, cpu_count
+import numpy as np
+from question3 import ALPHABET, LETTER_INDEX, digraph_rule, playfair_de, playfair_en, prepare_bytes
+from fitness import build_table, corpus_codes, expected_score, load_table, tables_available
+
+# Playfair letter index (no J) -> 0..25 letter index used by the quadgram table
+TO_26 = np.array([ord(c) - ord('A') for c in ALPHABET])
+IDENTITY_MATRIX = [list(ALPHABET[i:i+5]) for i in range(0, 25, 5)]
+
+
+# The Playfair rules only depend on where two letters sit in the square, so
+# one 625-entry table over positions serves every candidate key: a key is
+# then just the letter found at each position.
+def position_table(step):
+    table = np.zeros(625, dtype=np.int64)
+    for i, first in enumerate(ALPHABET):
+        for j, second in enumerate(ALPHABET):
+            out = digraph_rule(IDENTITY_MATRIX, first, second, step)
+            table[25 * i + j] = 25 * ALPHABET.index(out[0]) + ALPHABET.index(out[1])
+    return table
+
+DECRYPT_POSITIONS = position_table(-1)
+
+
+# Row swaps, column swaps, row/column reversal and transpose of the square,
+# as permutations of the 25 positions
+def structural_perms():
+    grid = np.arange(25).reshape(5, 5)
+    perms = []
+    for i in range(5):
+        for j in range(i + 1, 5):
+            rows = grid.copy()
+            rows[[i, j]] = rows[[j, i]]
+            cols = grid.copy()
+            cols[:, [i, j]] = cols[:, [j, i]]
+            perms += [rows.ravel(), cols.ravel()]
+    perms += [grid[::-1].ravel(), grid[:, ::-1].ravel(), grid.T.ravel()]
+    return np.array(perms)
+
+STRUCTURAL_PERMS = structural_perms()
+
+
+# Decrypt the ciphertext under a whole batch of squares and score each one.
+# squares[k, p] is the letter at position p of the k-th square. Plaintext is
+# a run of digraphs d, so quadgrams starting on a digraph are 676*d[i] +
+# d[i+1] and the ones straddling three digraphs are built the same way.
+def score_batch(squares, first, second, table):
+    rows = np.arange(len(squares))[:, None]
+    pos = np.empty_like(squares)
+    pos[rows, squares] = np.arange(25)
+    out = DECRYPT_POSITIONS[25 * pos[:, first] + pos[:, second]]
+    letters = TO_26[squares]
+    p0 = letters[rows, out // 25]
+    p1 = letters[rows, out % 25]
+    d = 26 * p0 + p1
+    return (table[676 * d[:, :-1] + d[:, 1:]].sum(axis=1)
+            + table[17576 * p1[:, :-2] + 26 * d[:, 1:-1] + p0[:, 2:]].sum(axis=1))
+
+
+# A batch of neighbours of one square: mostly two-letter swaps, sometimes a
+# row/column shuffle or a reflection of the whole square
+def neighbours(square, batch, rng, structural=0.1):
+    rows = np.arange(batch)
+    perm = np.tile(np.arange(25), (batch, 1))
+    i, j = rng.integers(25, size=(2, batch))
+    perm[rows, i] = j
+    perm[rows, j] = i
+    big = rng.random(batch) < structural
+    perm[big] = STRUCTURAL_PERMS[rng.integers(len(STRUCTURAL_PERMS), size=big.sum())]
+    return square[perm]
+
+
+# Shared with the pool workers once, instead of pickling per restart
+TABLE = None
+
+def init_worker(table):
+    global TABLE
+    TABLE = table
+
+
+# Every single swap of two letters plus the structural moves, as
+# permutations of the 25 positions
+def all_moves():
+    perms = [np.arange(25) for _ in range(300)]
+    k = 0
+    for i in range(25):
+        for j in range(i + 1, 25):
+            perms[k] = perms[k].copy()
+            perms[k][[i, j]] = [j, i]
+            k += 1
+    return np.vstack([np.array(perms), STRUCTURAL_PERMS])
+
+ALL_MOVES = all_moves()
+
+# Steepest-ascent hill climb over ALL_MOVES until no move improves the score,
+# so a restart never stops on a square that a single swap would still fix
+def polish(square, score, first, second):
+    while True:
+        candidates = square[ALL_MOVES]
+        scores = score_batch(candidates, first, second, TABLE)
+        k = int(np.argmax(scores))
+        if scores[k] <= score:
+            return square, score
+        square, score = candidates[k], scores[k]
+
+
+# One restart of simulated annealing. Rejected proposals leave the state
+# unchanged, so a batch of proposals from the same square can be scored at
+# once and the first accepted one taken: this follows the same path as
+# proposing them one by one. The batch grows as the acceptance rate drops.
+def anneal(job):
+    cipher_idx, seed, max_batch, temp, step, count, target = job
+    rng = np.random.default_rng(seed)
+    first, second = cipher_idx[0::2], cipher_idx[1::2]
+    square = rng.permutation(25)
+    score = score_batch(square[None, :], first, second, TABLE)[0]
+    best_score, best_square = score, square.copy()
+    evaluated = 1
+    accept_rate = 1.0
+
+    while temp > 0:
+        proposals = 0
+        while proposals < count:
+            batch = int(min(max_batch, max(1, 2 / accept_rate)))
+            candidates = neighbours(square, batch, rng)
+            new_scores = score_batch(candidates, first, second, TABLE)
+            evaluated += batch
+            delta = new_scores - score
+            accept = (delta > 0) | (rng.random(batch) < np.exp(np.minimum(delta, 0) / temp))
+            hits = np.flatnonzero(accept)
+            if len(hits) == 0:
+                proposals += batch
+                accept_rate = max(accept_rate * 0.5, 1 / max_batch)
+                continue
+
+            k = hits[0]
+            proposals += k + 1
+            accept_rate = 0.9 * accept_rate + 0.1 / (k + 1)
+            square, score = candidates[k], new_scores[k]
+            if score > best_score:
+                best_score, best_square = score, square.copy()
+                if best_score >= target:
+                    temp = 0
+                    break
+        temp -= step
+    best_square, best_score = polish(best_square, best_score, first, second)
+    return float(best_score), best_square, evaluated
+
+
+def square_to_key(square):
+    return ''.join(ALPHABET[i] for i in square)
+
+
+# Run restarts over a process pool. Reaching the target fitness (per
+# quadgram, log10) alone is not taken as solved: a wrong square can score
+# that well. The search stops once `confirm` polished restarts reaching the
+# target agree on the plaintext (equivalent squares decrypt identically).
+def crack_playfair(ciphertext, table, target_per_quadgram, restarts=8, workers=None,
+                   batch=64, temp=10.0, step=0.2, count=10000, seed=0, confirm=2):
+    cipher_idx = LETTER_INDEX[prepare_bytes(ciphertext)]
+    target = target_per_quadgram * (len(cipher_idx) - 3)
+    jobs = [(cipher_idx, seed + r, batch, temp, step, count, target) for r in range(restarts)]
+
+    best_score, best_square, evaluated = -np.inf, None, 0
+    agreeing = {}
+    confirmations = 0
+    start = time.perf_counter()
+    with Pool(workers or cpu_count(), initializer=init_worker, initargs=(table,)) as pool:
+        for score, square, keys in pool.imap_unordered(anneal, jobs):
+            evaluated += keys
+            if score > best_score:
+                best_score, best_square = score, square
+            if score >= target:
+                plaintext = playfair_de(ciphertext, square_to_key(square))
+                agreeing[plaintext] = agreeing.get(plaintext, 0) + 1
+                confirmations = agreeing.get(playfair_de(ciphertext, square_to_key(best_square)), 0)
+                if confirmations >= confirm:
+                    pool.terminate()
+                    break
+    elapsed = time.perf_counter() - start
+
+    key = square_to_key(best_square)
+    return {
+        "key": key,
+        "plaintext": playfair_de(ciphertext, key),
+        "score": best_score / (len(cipher_idx) - 3),
+        "reached_target": best_score >= target,
+        "confirmations": confirmations,
+        "converged": confirmations >= confirm,
+        "keys_evaluated": evaluated,
+        "keys_per_sec": evaluated / elapsed,
+        "seconds": elapsed,
+    }
+
+
+DEMO_TEXT = """
+The history of cryptography begins thousands of years ago. Until recent decades
+it has been the story of what might be called classical cryptography, that is,
+of methods of encryption that use pen and paper, or perhaps simple mechanical
+aids. The Playfair cipher was the first practical digraph substitution cipher.
+It was used for tactical purposes by British forces in the Second Boer War and
+in World War I and for the same purpose by the Australians during World War II.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ciphertext-only Playfair key recovery")
+    parser.add_argument("--corpus", help="English text to train quadgrams from (default: saved fitness tables)")
+    parser.add_argument("--ciphertext", help="ciphertext to attack (defaults to an encrypted demo text)")
+    parser.add_argument("--restarts", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--slack", type=float, default=1.3,
+                        help="a restart counts as a hit once fitness is within this factor of English fitness")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="stop once this many hits agree on the plaintext")
+    args = parser.parse_args()
+
+    # Playfair plaintext never contains J, so fold it into I when training
+    if args.corpus:
+        table = build_table(corpus_codes(args.corpus, fold_j=True))
+    elif tables_available(4, fold_j=True):
+        table = load_table(4, fold_j=True)
+    else:
+        parser.error("no saved fitness tables; run 'python fitness.py build CORPUS' or pass --corpus")
+    target = expected_score(table) * args.slack
+
+    ciphertext = args.ciphertext
+    if ciphertext is None:
+        ciphertext = playfair_en(DEMO_TEXT, "CRYPTOGRAPHIC")
+    print("Ciphertext:", ciphertext)
+
+    result = crack_playfair(ciphertext, table, target, restarts=args.restarts, workers=args.workers,
+                            confirm=args.confirm)
+    print("Key square:", result["key"])
+    print("Plaintext :", result["plaintext"])
+    print(f"Fitness   : {result['score']:.3f} per quadgram (target {target:.3f})")
+    if result["converged"]:
+        print(f"Converged : {result['confirmations']} restarts agree on this plaintext")
+    elif result["reached_target"]:
+        print(f"Not confirmed: only {result['confirmations']} of {args.confirm} restarts reached this plaintext, "
+              "it may be a near miss; try more --restarts")
+    else:
+        print("Not converged: no restart reached the target; try more --restarts")
+    print(f"Evaluated {result['keys_evaluated']} keys in {result['seconds']:.1f} s "
+          f"({result['keys_per_sec']:.0f} keys/sec)")
+
+
+if __name__ == "__main__":
+    main()
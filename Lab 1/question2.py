@@ -22,26 +22,49 @@ def decrypt_vigenere(encrypted_data, key):
         decrypted_data = (p_num-k_num)%26
         cipher += num_to_letter(decrypted_data)
     return cipher
+# Autokey only ever needs the previous plaintext letter, so the stream keeps
+# that one-letter carry between chunks and any chunking gives the same output.
+class AutokeyStream:
+    def __init__(self, key, decrypt=False):
+        self.carry = key
+        self.decrypt = decrypt
+
+    def update(self, chunk):
+        out = []
+        carry = self.carry
+        if self.decrypt:
+            for char in chunk:
+                carry = (letter_to_num(char)-carry)%26
+                out.append(num_to_letter(carry))
+        else:
+            for char in chunk:
+                p_num = letter_to_num(char)
+                out.append(num_to_letter((p_num+carry)%26))
+                carry = p_num
+        self.carry = carry
+        return ''.join(out)
+
+    def stream(self, chunks):
+        for chunk in chunks:
+            yield self.update(chunk)
+
+def read_chunks(file, chunk_size=1 << 16):
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def autokey_file(in_path, out_path, key, decrypt=False, chunk_size=1 << 16):
+    stream = AutokeyStream(key, decrypt)
+    with open(in_path) as src, open(out_path, "w") as dst:
+        for chunk in stream.stream(read_chunks(src, chunk_size)):
+            dst.write(chunk)
+
 def encrypt_autokey(plaintext, key):
-    cipher = ""
-    key_stream = [key]
-    for i,char in enumerate(plaintext):
-        p_num = letter_to_num(char)
-        k_num = key_stream[i]
-        encrypted_data = (p_num+k_num)%26
-        cipher += num_to_letter(encrypted_data)
-        key_stream.append(p_num)
-    return cipher
+    return AutokeyStream(key).update(plaintext)
 def decrypt_autokey(decrypted_data, key):
-    cipher = ""
-    key_stream = [key]
-    for i,char in enumerate(decrypted_data):
-        p_num = letter_to_num(char)
-        k_num = key_stream[i]
-        encrypted_data = (p_num-k_num)%26
-        cipher += num_to_letter(encrypted_data)
-        key_stream.append(encrypted_data)
-    return cipher
+    return AutokeyStream(key, decrypt=True).update(decrypted_data)
 if __name__ == "__main__":
     plaintext = "the house is being sold tonight".replace(" ","").upper();
     vigenere_key = "dollars"
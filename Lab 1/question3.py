@@ -1,5 +1,11 @@
+import sys
+import time
+from functools import lru_cache
+import numpy as np
+
 def generate_playfair_matrix(key):
-    key = ''.join(sorted(set(key.upper()), key=key.upper().index))
+    key = ''.join(c for c in key.upper() if 'A' <= c <= 'Z').replace('J', 'I')
+    key = ''.join(sorted(set(key), key=key.index))
     alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     matrix = []
 
@@ -21,57 +27,113 @@ def find_pos(matrix, char):
             return row_idx, col_idx
     return None
 
-def prepare_text(text):
+# Prepared text as one byte array. Pairs are aligned from the start and only
+# a doubled letter at a pair start shifts the alignment (by inserting an X),
+# so the Python loop runs over doubled letters only, not over every pair.
+def prepare_bytes(text):
     text = ''.join(filter(str.isalpha, text.upper()))
     text = text.replace('J', 'I')
-    pairs = []
-    i = 0
-    while i < len(text):
-        if i + 1 < len(text) and text[i] != text[i+1]:
-            pairs.append(text[i:i+2])
-            i += 2
-        else:
-            pairs.append(text[i]+'X')
-            i += 1
-    return pairs
-
-def playfair_en(ptext, pfk):
-    matrix = generate_playfair_matrix(pfk)
-    ptext_pairs = prepare_text(ptext)
-
-    ctext = []
-    for pair in ptext_pairs:
-        r1, c1 = find_pos(matrix, pair[0])
-        r2, c2 = find_pos(matrix, pair[1])
+    data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    inserts = []
+    start = 0
+    for k in np.flatnonzero(data[:-1] == data[1:]):
+        if k >= start and (k - start) % 2 == 0:
+            inserts.append(k + 1)
+            start = k + 1
+    if (len(data) + len(inserts)) % 2:
+        inserts.append(len(data))
+    return np.insert(data, inserts, ord('X'))
 
-        if r1 == r2:
-            ctext.append(matrix[r1][(c1 + 1) % 5] + matrix[r2][(c2 + 1) % 5])
-        elif c1 == c2:
-            ctext.append(matrix[(r1 + 1) % 5][c1] + matrix[(r2 + 1) % 5][c2])
-        else:
-            ctext.append(matrix[r1][c2] + matrix[r2][c1])
+def prepare_text(text):
+    text = prepare_bytes(text).tobytes().decode('ascii')
+    return [text[i:i+2] for i in range(0, len(text), 2)]
+
+ALPHABET = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
+
+# Byte value -> index into ALPHABET, used to turn prepared text into indices
+LETTER_INDEX = np.zeros(256, dtype=np.int64)
+for idx, char in enumerate(ALPHABET):
+    LETTER_INDEX[ord(char)] = idx
+ALPHABET_BYTES = np.frombuffer(ALPHABET.encode(), dtype=np.uint8)
+
+def digraph_rule(matrix, first, second, step):
+    r1, c1 = find_pos(matrix, first)
+    r2, c2 = find_pos(matrix, second)
+    if r1 == r2:
+        return matrix[r1][(c1 + step) % 5] + matrix[r2][(c2 + step) % 5]
+    elif c1 == c2:
+        return matrix[(r1 + step) % 5][c1] + matrix[(r2 + step) % 5][c2]
+    return matrix[r1][c2] + matrix[r2][c1]
+
+# A key compiled once into digraph -> digraph tables. A digraph is coded as
+# 25 * first + second over ALPHABET, so each direction is a 625-entry array.
+class PlayfairKey:
+    def __init__(self, key):
+        self.matrix = generate_playfair_matrix(key)
+        self.encrypt_table = self.build_table(1)
+        self.decrypt_table = self.build_table(-1)
+
+    def build_table(self, step):
+        table = np.zeros(625, dtype=np.int64)
+        for i, first in enumerate(ALPHABET):
+            for j, second in enumerate(ALPHABET):
+                out = digraph_rule(self.matrix, first, second, step)
+                table[25 * i + j] = 25 * ALPHABET.index(out[0]) + ALPHABET.index(out[1])
+        return table
+
+    def apply(self, data, table):
+        idx = LETTER_INDEX[data]
+        out = table[25 * idx[0::2] + idx[1::2]]
+        result = np.empty(len(data), dtype=np.uint8)
+        result[0::2] = ALPHABET_BYTES[out // 25]
+        result[1::2] = ALPHABET_BYTES[out % 25]
+        return result.tobytes().decode('ascii')
+
+    def encrypt(self, ptext):
+        return self.apply(prepare_bytes(ptext), self.encrypt_table)
+
+    def decrypt(self, ctext):
+        return self.apply(prepare_bytes(ctext), self.decrypt_table)
+
+@lru_cache(maxsize=128)
+def compile_playfair(pfk):
+    return PlayfairKey(pfk)
 
-    return ''.join(ctext)
+def playfair_en(ptext, pfk):
+    return compile_playfair(pfk).encrypt(ptext)
 
 def playfair_de(ctext, pfk):
+    return compile_playfair(pfk).decrypt(ctext)
+
+# Original matrix-scanning encryption, kept as the benchmark baseline
+def playfair_en_scan(ptext, pfk):
     matrix = generate_playfair_matrix(pfk)
-    ctext_pairs = prepare_text(ctext)
+    return ''.join(digraph_rule(matrix, pair[0], pair[1], 1) for pair in prepare_text(ptext))
 
-    ptext = []
-    for pair in ctext_pairs:
-        r1, c1 = find_pos(matrix, pair[0])
-        r2, c2 = find_pos(matrix, pair[1])
+def benchmark(sizes=(1_000, 10_000, 100_000, 1_000_000), pfk="MONARCHY"):
+    sample = "INSTRUMENTSOFTHEOPERATIONWILLBEREADYATDAWN"
+    compile_playfair(pfk)
+    print(f"{'Size':>10} {'scan MB/s':>11} {'table MB/s':>11} {'speedup':>9}")
+    for size in sizes:
+        ptext = (sample * (size // len(sample) + 1))[:size]
 
-        if r1 == r2:
-            ptext.append(matrix[r1][(c1 - 1) % 5] + matrix[r2][(c2 - 1) % 5])
-        elif c1 == c2:
-            ptext.append(matrix[(r1 - 1) % 5][c1] + matrix[(r2 - 1) % 5][c2])
-        else:
-            ptext.append(matrix[r1][c2] + matrix[r2][c1])
+        start = time.perf_counter()
+        slow = playfair_en_scan(ptext, pfk)
+        scan = time.perf_counter() - start
 
-    return ''.join(ptext)
+        start = time.perf_counter()
+        fast = playfair_en(ptext, pfk)
+        table = time.perf_counter() - start
+
+        assert slow == fast
+        mb = size / (1024 * 1024)
+        print(f"{size:>10} {mb / scan:>11.2f} {mb / table:>11.2f} {scan / table:>8.1f}x")
 
 def main():
+    if "--bench" in sys.argv:
+        benchmark()
+        return
+
     ptext = input("Kindly enter your desired plaintext: ")
     pfk = input("Kindly enter the Playfair Key: ")
 
@@ -1,16 +1,90 @@
+import sys
+import time
 import numpy as np
+
+def clean_text(text,n):
+    text = ''.join(filter(str.isalpha,text)).upper()
+    if len(text) % n != 0:
+        text += 'X'*(n - len(text) % n)
+    return text
+
+# Inverse of an n x n key mod 26 via the adjugate: K^-1 = det^-1 * adj(K)
+def mod_matrix_inverse(key,m=26):
+    key = np.asarray(key)
+    det = int(round(np.linalg.det(key)))
+    det_inverse = pow(det % m, -1, m)
+    adjugate = np.round(det*np.linalg.inv(key)).astype(np.int64)
+    return (det_inverse*adjugate) % m
+
+# Every block of every message goes into one (n x blocks) matrix so the whole
+# batch is a single np.dot; offsets split the result back into messages.
+def hill_batch(texts,key):
+    key = np.asarray(key)
+    n = key.shape[0]
+    texts = [clean_text(text,n) for text in texts]
+    joined = ''.join(texts).encode('ascii')
+    numbers = np.frombuffer(joined,dtype=np.uint8).astype(np.int64)-ord('A')
+    blocks = numbers.reshape(-1,n).T
+    result = (np.dot(key,blocks)%26).T.ravel()+ord('A')
+    result = result.astype(np.uint8).tobytes().decode('ascii')
+    out = []
+    offset = 0
+    for text in texts:
+        out.append(result[offset:offset+len(text)])
+        offset += len(text)
+    return out
+
+def hill_encrypt_batch(messages,key):
+    return hill_batch(messages,key)
+
+def hill_decrypt_batch(ciphertexts,key):
+    return hill_batch(ciphertexts,mod_matrix_inverse(key))
+
 def hill_encrypt(plaintext,key):
-    plaintext = ''.join(filter(str.isalpha,plaintext)).upper()
-    numbers = [ord(char)-ord('A') for char in plaintext]
-    if len(numbers) % 2!=0:
-        numbers.append(ord('X')-ord('A'))
-    plaintext_matrix = np.array(numbers).reshape(-1,2).T
+    return hill_encrypt_batch([plaintext],key)[0]
+
+def hill_decrypt(ciphertext,key):
+    return hill_decrypt_batch([ciphertext],key)[0]
+
+# Single-message loop over the original 2x2 code path, kept as the baseline
+def hill_encrypt_single(plaintext,key):
+    n = key.shape[0]
+    numbers = [ord(char)-ord('A') for char in clean_text(plaintext,n)]
+    plaintext_matrix = np.array(numbers).reshape(-1,n).T
     encrypted_matrix = (np.dot(key,plaintext_matrix)%26)
     encrypted_numbers = encrypted_matrix.T.flatten()
-    cipherText = ''.join(chr(num+ord('A')) for num in encrypted_numbers)
-    return cipherText
-key = np.array([[3,3],[2,7]])
-message = "We live in an insecure world"
-encrypted_data = hill_encrypt(message,key)
-print("Ciphered Data:",encrypted_data)
+    return ''.join(chr(num+ord('A')) for num in encrypted_numbers)
+
+def benchmark(count=100_000):
+    key = np.array([[6,24,1],[13,16,10],[20,17,15]])
+    words = ["We live in an insecure world","Attack at dawn","Meet me near the old bridge"]
+    messages = [words[i % len(words)] for i in range(count)]
+
+    start = time.perf_counter()
+    slow = [hill_encrypt_single(message,key) for message in messages]
+    single = time.perf_counter()-start
+
+    start = time.perf_counter()
+    fast = hill_encrypt_batch(messages,key)
+    batch = time.perf_counter()-start
+
+    start = time.perf_counter()
+    back = hill_decrypt_batch(fast,key)
+    decrypt = time.perf_counter()-start
+
+    assert slow == fast
+    assert back[0] == clean_text(messages[0],3)
+    print(f"{count} messages, 3x3 key")
+    print(f"Per-message encrypt: {single:.3f} s ({count/single:,.0f} msg/s)")
+    print(f"Batch encrypt:       {batch:.3f} s ({count/batch:,.0f} msg/s)")
+    print(f"Batch decrypt:       {decrypt:.3f} s ({count/decrypt:,.0f} msg/s)")
 
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+    key = np.array([[3,3],[2,7]])
+    message = "We live in an insecure world"
+    encrypted_data = hill_encrypt(message,key)
+    print("Ciphered Data:",encrypted_data)
+    print("Deciphered Data:",hill_decrypt(encrypted_data,key))
@@ -1,3 +1,5 @@
+from AQ1 import rank_shifts
+
 def find_shift_key(plaintext,ciphertext):
     p_num = ord(plaintext[0].upper()) - ord('A')
     c_num = ord(ciphertext[0].upper()) - ord('A')
@@ -5,6 +7,10 @@ def find_shift_key(plaintext,ciphertext):
     shift_key = (c_num-p_num) % 26
     return shift_key
 
+# No known plaintext: rank all 26 shifts by letter frequency instead
+def find_shift_key_ranked(ciphertext):
+    return rank_shifts(ciphertext)[0][1]
+
 def decrypt_cipher(ciphertext,key):
     decrypted = []
     for char in ciphertext:
@@ -23,6 +29,10 @@ def main():
 
     plaintext = decrypt_cipher(new_cipher,key)
     print("The text is :",plaintext)
+
+    print("Shifts ranked without the known text:")
+    for score,key,text in rank_shifts(new_cipher)[:3]:
+        print(key,text.lower(),round(score,1))
     print("Program executed!")
 
 if __name__ == "__main__":
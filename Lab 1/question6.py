@@ -1,4 +1,8 @@
+import sys
+import time
 from math import gcd
+import numpy as np
+from fitness import load_table, score_batch, tables_available
 
 
 # Convert letter to number
@@ -30,6 +34,94 @@ def affine_decrypt(y, a_inv, b):
     return (a_inv * (y - b)) % 26
 
 
+# Relative frequencies of A..Z in English text
+ENGLISH_FREQ = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074])
+
+# All 12 * 26 = 312 valid keys as parallel arrays
+VALID_A = np.array([a for a in range(1, 26) if gcd(a, 26) == 1])
+KEY_A = np.repeat(VALID_A, 26)
+KEY_B = np.tile(np.arange(26), len(VALID_A))
+
+
+# Ciphertext letters as an array of 0..25, everything else dropped
+def text_to_nums(text):
+    data = np.frombuffer(text.upper().encode('ascii', 'ignore'), dtype=np.uint8)
+    data = data[(data >= ord('A')) & (data <= ord('Z'))]
+    return (data - ord('A')).astype(np.int64)
+
+
+# Keep only the keys that map the crib plaintext onto the crib ciphertext
+def prune_keys(crib, a_keys, b_keys):
+    crib_plain, crib_cipher = crib
+    p = text_to_nums(crib_plain)
+    c = text_to_nums(crib_cipher)
+    enc = (a_keys[:, None] * p[None, :] + b_keys[:, None]) % 26
+    mask = (enc == c[None, :]).all(axis=1)
+    return a_keys[mask], b_keys[mask]
+
+
+# Decrypt the same ciphertext under many keys at once: one row per key
+def decrypt_all_keys(nums, a_keys, b_keys):
+    a_inv = np.array([modinv(a, 26) for a in a_keys], dtype=np.int64)
+    return (a_inv[:, None] * (nums[None, :] - b_keys[:, None])) % 26
+
+
+# Chi-squared of every key's plaintext against English.
+# Plaintext letter x under key (a, b) is ciphertext letter a*x + b, so each
+# key's plaintext histogram is just the ciphertext histogram gathered through
+# the (keys x 26) encryption table; no per-key pass over the text is needed.
+def chi_squared_scores(nums, a_keys, b_keys):
+    counts = np.bincount(nums, minlength=26)
+    enc_table = (a_keys[:, None] * np.arange(26)[None, :] + b_keys[:, None]) % 26
+    observed = counts[enc_table]
+    expected = ENGLISH_FREQ * len(nums)
+    return (((observed - expected) ** 2) / expected).sum(axis=1)
+
+
+# Rank all keys (or those left after the crib) without needing a crib.
+# With a quadgram table the chi-squared shortlist is re-ranked by quadgram
+# fitness (higher is better) instead.
+def crack_affine(ciphertext, top_k=5, crib=None, table=None, shortlist=20):
+    nums = text_to_nums(ciphertext)
+    a_keys, b_keys = KEY_A, KEY_B
+    if crib is not None:
+        a_keys, b_keys = prune_keys(crib, a_keys, b_keys)
+    if len(a_keys) == 0 or len(nums) == 0:
+        return []
+
+    scores = chi_squared_scores(nums, a_keys, b_keys)
+    if table is None:
+        order = np.argsort(scores)[:top_k]
+        plains = decrypt_all_keys(nums, a_keys[order], b_keys[order])
+    else:
+        order = np.argsort(scores)[:max(top_k, shortlist)]
+        plains = decrypt_all_keys(nums, a_keys[order], b_keys[order])
+        scores = np.zeros(len(scores))
+        scores[order] = score_batch(plains, table=table)
+        rerank = np.argsort(-scores[order])[:top_k]
+        order, plains = order[rerank], plains[rerank]
+
+    results = []
+    for row, idx in enumerate(order):
+        plaintext = (plains[row] + ord('A')).astype(np.uint8).tobytes().decode('ascii')
+        results.append((float(scores[idx]), int(a_keys[idx]), int(b_keys[idx]), plaintext))
+    return results
+
+
+def benchmark(size_kb=500):
+    sample = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOGANDRUNSINTOTHEFORESTTOHIDE"
+    text = (sample * (size_kb * 1024 // len(sample) + 1))[:size_kb * 1024]
+    ciphertext = ''.join(num_to_letter(affine_encrypt(letter_to_num(c), 7, 3)) for c in text)
+    start = time.perf_counter()
+    best = crack_affine(ciphertext, top_k=1)[0]
+    elapsed = time.perf_counter() - start
+    print(f"{size_kb} KB cracked in {elapsed * 1000:.1f} ms -> a = {best[1]}, b = {best[2]}")
+
+
 # Known plaintext-ciphertext pair
 plaintext_pair = "ab"
 ciphertext_pair = "GL"
@@ -69,10 +161,32 @@ def brute_force_affine():
     return None, None, None
 
 
-a, b, decrypted_text = brute_force_affine()
+def main():
+    if "--bench" in sys.argv:
+        benchmark()
+        return
+
+    a, b, decrypted_text = brute_force_affine()
+
+    if decrypted_text:
+        print(f"Found keys: a = {a}, b = {b}")
+        print(f"Decrypted text: {decrypted_text.lower()}")
+    else:
+        print("No valid keys found.")
+
+    print("\nRanked without a crib:")
+    for score, a, b, plaintext in crack_affine(ciphertext, top_k=3):
+        print(f"a = {a:2d}, b = {b:2d}, chi2 = {score:8.2f}: {plaintext.lower()}")
+
+    if tables_available():
+        print("\nRe-ranked by quadgram fitness:")
+        for score, a, b, plaintext in crack_affine(ciphertext, top_k=3, table=load_table(4)):
+            print(f"a = {a:2d}, b = {b:2d}, fitness = {score:8.2f}: {plaintext.lower()}")
+
+    print("\nWith crib {} -> {}:".format(plaintext_pair, ciphertext_pair))
+    for score, a, b, plaintext in crack_affine(ciphertext, crib=(plaintext_pair, ciphertext_pair)):
+        print(f"a = {a:2d}, b = {b:2d}, chi2 = {score:8.2f}: {plaintext.lower()}")
+
 
-if decrypted_text:
-    print(f"Found keys: a = {a}, b = {b}")
-    print(f"Decrypted text: {decrypted_text.lower()}")
-else:
-    print("No valid keys found.")
+if __name__ == "__main__":
+    main()
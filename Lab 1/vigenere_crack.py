@@ -0,0 +1,111 @@
+import sys
+import time
+import numpy as np
+from question2 import encrypt_vigenere
+from question6 import ENGLISH_FREQ, text_to_nums
+
+MIN_COLUMN = 20
+
+# Letter counts of every column for one key length, shape (key_len, 26).
+# The text is viewed as rows of key_len letters, so column j is a strided
+# view; offsetting each column by 26*j lets one bincount count them all.
+def column_counts(nums, key_len):
+    rows = len(nums) // key_len
+    view = nums[:rows * key_len].reshape(rows, key_len)
+    offsets = 26 * np.arange(key_len)
+    counts = np.bincount((view + offsets).ravel(), minlength=26 * key_len).reshape(key_len, 26)
+    # the leftover partial row still belongs to the first columns
+    tail = nums[rows * key_len:]
+    counts[np.arange(len(tail)), tail] += 1
+    return counts
+
+
+# Mean normalised index of coincidence of the columns for each key length
+def ioc_by_length(nums, max_len=100):
+    # columns much shorter than this give an IoC that is mostly noise
+    max_len = max(1, min(max_len, len(nums), len(nums) // MIN_COLUMN))
+    iocs = np.zeros(max_len + 1)
+    for key_len in range(1, max_len + 1):
+        counts = column_counts(nums, key_len)
+        totals = counts.sum(axis=1)
+        pairs = (counts * (counts - 1)).sum(axis=1)
+        iocs[key_len] = 26 * (pairs / np.maximum(totals * (totals - 1), 1)).mean()
+    return iocs
+
+
+# Multiples of the true length score as well as the length itself, so take
+# the shortest length that comes close to the best score. iocs[0] is a
+# placeholder, so it is left out; with no usable columns this gives 1.
+def estimate_key_length(nums, max_len=100, tolerance=0.9):
+    if len(nums) == 0:
+        raise ValueError("Ciphertext contains no letters")
+    iocs = ioc_by_length(nums, max_len)[1:]
+    return 1 + int(np.argmax(iocs >= tolerance * iocs.max()))
+
+
+# Best shift of every column by correlating its counts with English.
+# shifted[j, s, x] is the count of ciphertext letter x + s in column j.
+def solve_shifts(nums, key_len):
+    counts = column_counts(nums, key_len)
+    idx = (np.arange(26)[:, None] + np.arange(26)[None, :]) % 26
+    correlation = counts[:, idx] @ ENGLISH_FREQ
+    return np.argmax(correlation, axis=1)
+
+
+def crack_vigenere(ciphertext, max_len=100, key_len=None):
+    nums = text_to_nums(ciphertext)
+    if len(nums) == 0:
+        raise ValueError("Ciphertext contains no letters")
+    if key_len is None:
+        key_len = estimate_key_length(nums, max_len)
+    shifts = solve_shifts(nums, key_len)
+    key = ''.join(chr(s + ord('A')) for s in shifts)
+    plain = (nums - np.resize(shifts, len(nums))) % 26
+    plaintext = (plain + ord('A')).astype(np.uint8).tobytes().decode('ascii')
+    return key, plaintext
+
+
+def benchmark(size_kb=1024, key="CRYPTANALYSIS"):
+    sample = ''.join(filter(str.isalpha, DEMO_TEXT.upper()))
+    text = (sample * (size_kb * 1024 // len(sample) + 1))[:size_kb * 1024]
+    ciphertext = encrypt_vigenere(text, key)
+    start = time.perf_counter()
+    found, _ = crack_vigenere(ciphertext)
+    elapsed = time.perf_counter() - start
+    print(f"{size_kb} KB, key lengths 1..100: recovered {found} in {elapsed * 1000:.1f} ms")
+
+
+DEMO_TEXT = """
+It was the best of times, it was the worst of times, it was the age of wisdom,
+it was the age of foolishness, it was the epoch of belief, it was the epoch of
+incredulity, it was the season of Light, it was the season of Darkness, it was
+the spring of hope, it was the winter of despair, we had everything before us,
+we had nothing before us, we were all going direct to Heaven, we were all going
+direct the other way. In short, the period was so far like the present period,
+that some of its noisiest authorities insisted on its being received, for good
+or for evil, in the superlative degree of comparison only. There were a king
+with a large jaw and a queen with a plain face, on the throne of England; there
+were a king with a large jaw and a queen with a fair face, on the throne of
+France. In both countries it was clearer than crystal to the lords of the State
+preserves of loaves and fishes, that things in general were settled for ever.
+"""
+
+
+def main():
+    if "--bench" in sys.argv:
+        benchmark()
+        return
+
+    plaintext = ''.join(filter(str.isalpha, DEMO_TEXT.upper()))
+    key = "dollars"
+    ciphertext = encrypt_vigenere(plaintext, key)
+    print("Ciphertext :", ciphertext[:60], "...")
+
+    found_key, found_text = crack_vigenere(ciphertext)
+    print("Recovered key :", found_key)
+    print("Recovered text:", found_text[:60], "...")
+    print("Success:", found_text == plaintext)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import argparse
+import os
 import time
-import matplotlib.pyplot as plt
+import numpy as np
 from Crypto.Cipher import DES, AES
-from Crypto.Util.Padding import pad
+from Crypto.Util.Padding import pad, unpad
 from Crypto.Random import get_random_bytes
+from cipher_registry import new_cipher, pycryptodome_cipher
+from question3 import parse_size, payload_sizes
 
 messages = [
     "This a super secret message",
@@ -12,82 +16,215 @@ messages = [
     "cope"
 ]
 
+# GCM ciphertext is ct || tag; decryption raises ValueError if the tag
+# does not verify
+GCM_TAG_SIZE = 16
+
 modes = {
     "ECB": lambda cipher, data: cipher.encrypt(pad(data, cipher.block_size)),
     "CBC": lambda cipher, data: cipher.encrypt(pad(data, cipher.block_size)),
     "CFB": lambda cipher, data: cipher.encrypt(data),
-    "OFB": lambda cipher, data: cipher.encrypt(data)
+    "OFB": lambda cipher, data: cipher.encrypt(data),
+    "CTR": lambda cipher, data: cipher.encrypt(data),
+    "GCM": lambda cipher, data: b"".join(cipher.encrypt_and_digest(data))
+}
+
+decrypt_modes = {
+    "ECB": lambda cipher, data: unpad(cipher.decrypt(data), cipher.block_size),
+    "CBC": lambda cipher, data: unpad(cipher.decrypt(data), cipher.block_size),
+    "CFB": lambda cipher, data: cipher.decrypt(data),
+    "OFB": lambda cipher, data: cipher.decrypt(data),
+    "CTR": lambda cipher, data: cipher.decrypt(data),
+    "GCM": lambda cipher, data: cipher.decrypt_and_verify(data[:-GCM_TAG_SIZE], data[-GCM_TAG_SIZE:])
 }
 
-def encrypt_des(pt, key, mode_name):
+PADDED_MODES = {"ECB", "CBC"}
+
+# algorithm -> (module, key length)
+ALGORITHMS = {
+    "DES": (DES, 8),
+    "AES-128": (AES, 16),
+    "AES-192": (AES, 24),
+    "AES-256": (AES, 32)
+}
+
+# GCM is only defined for 128-bit block ciphers
+def supported(algorithm, mode_name):
+    return not (algorithm == "DES" and mode_name == "GCM")
+
+def encrypt_des(pt, key, mode_name, iv=None):
     pt = pt.encode('utf-8')
     key = key[:8].encode('utf-8')
-    iv = get_random_bytes(8)
-
-    if mode_name == "ECB":
-        cipher = DES.new(key, DES.MODE_ECB)
-    elif mode_name == "CBC":
-        cipher = DES.new(key, DES.MODE_CBC, iv)
-    elif mode_name == "CFB":
-        cipher = DES.new(key, DES.MODE_CFB, iv)
-    elif mode_name == "OFB":
-        cipher = DES.new(key, DES.MODE_OFB, iv)
+    if iv is None:
+        iv = get_random_bytes(8)
 
+    cipher = new_cipher("DES", key, mode_name, iv)
     ct = modes[mode_name](cipher, pt)
     return ct
 
-def encrypt_aes(pt, key, mode_name, key_size):
+def decrypt_des(ct, key, mode_name, iv=None):
+    key = key[:8].encode('utf-8')
+    cipher = new_cipher("DES", key, mode_name, iv)
+    return decrypt_modes[mode_name](cipher, ct).decode('utf-8')
+
+def encrypt_aes(pt, key, mode_name, key_size, iv=None):
     pt = pt.encode('utf-8')
     key = key[:key_size].encode('utf-8')
-    iv = get_random_bytes(16)
-
-    if mode_name == "ECB":
-        cipher = AES.new(key, AES.MODE_ECB)
-    elif mode_name == "CBC":
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-    elif mode_name == "CFB":
-        cipher = AES.new(key, AES.MODE_CFB, iv)
-    elif mode_name == "OFB":
-        cipher = AES.new(key, AES.MODE_OFB, iv)
+    if iv is None:
+        iv = get_random_bytes(16)
 
+    cipher = new_cipher("AES", key, mode_name, iv)
     ct = modes[mode_name](cipher, pt)
     return ct
 
-def measure_time(func, *args):
-    start = time.perf_counter()
-    func(*args)
-    end = time.perf_counter()
-    return (end - start) * 1000  # milliseconds
-
-results = {}
+def decrypt_aes(ct, key, mode_name, key_size, iv=None):
+    key = key[:key_size].encode('utf-8')
+    cipher = new_cipher("AES", key, mode_name, iv)
+    return decrypt_modes[mode_name](cipher, ct).decode('utf-8')
 
-for mode in modes.keys():
-    results[mode] = {"DES": 0, "AES-128": 0, "AES-192": 0, "AES-256": 0}
+# Encrypt and decrypt the sample messages in every mode before timing anything
+def round_trip(mode_names):
     for msg in messages:
-        results[mode]["DES"] += measure_time(encrypt_des, msg, "12345678ABCDEFGH", mode)
-        results[mode]["AES-128"] += measure_time(encrypt_aes, msg, "FEDCBA9876543210FEDCBA9876543210", mode, 16)
-        results[mode]["AES-192"] += measure_time(encrypt_aes, msg, "FEDCBA9876543210FEDCBA9876543210", mode, 24)
-        results[mode]["AES-256"] += measure_time(encrypt_aes, msg, "FEDCBA9876543210FEDCBA9876543210", mode, 32)
-
-labels = list(results.keys())
-x = range(len(labels))
-width = 0.2
-
-des_times = [results[mode]["DES"] for mode in labels]
-aes128_times = [results[mode]["AES-128"] for mode in labels]
-aes192_times = [results[mode]["AES-192"] for mode in labels]
-aes256_times = [results[mode]["AES-256"] for mode in labels]
-
-plt.figure(figsize=(10, 6))
-plt.bar([i - 1.5*width for i in x], des_times, width, label='DES')
-plt.bar([i - 0.5*width for i in x], aes128_times, width, label='AES-128')
-plt.bar([i + 0.5*width for i in x], aes192_times, width, label='AES-192')
-plt.bar([i + 1.5*width for i in x], aes256_times, width, label='AES-256')
-
-plt.xticks(x, labels)
-plt.ylabel("Time (ms)")
-plt.title("Encryption Time Comparison by Mode and Algorithm")
-plt.legend()
-plt.tight_layout()
-plt.savefig("encryption_time_comparison.png")
-plt.show()
+        for mode_name in mode_names:
+            iv = get_random_bytes(16)
+            if supported("DES", mode_name):
+                ct = encrypt_des(msg, "12345678ABCDEFGH", mode_name, iv[:8])
+                assert decrypt_des(ct, "12345678ABCDEFGH", mode_name, iv[:8]) == msg
+            for key_size in (16, 24, 32):
+                ct = encrypt_aes(msg, "FEDCBA9876543210FEDCBA9876543210", mode_name, key_size, iv)
+                assert decrypt_aes(ct, "FEDCBA9876543210FEDCBA9876543210", mode_name, key_size, iv) == msg
+
+# Median seconds per call, repeating until min_time has passed
+def median_time(func, min_time, min_reps=3):
+    times = []
+    total = 0.0
+    while len(times) < min_reps or total < min_time:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    return float(np.median(times))
+
+def setup_cost(algorithm, mode_name, min_time):
+    module, key_len = ALGORITHMS[algorithm]
+    key = get_random_bytes(key_len)
+    iv = get_random_bytes(module.block_size)
+    batch = 1000
+
+    def build():
+        for _ in range(batch):
+            pycryptodome_cipher(module, key, mode_name, iv)
+
+    return median_time(build, min_time) / batch
+
+# Steady-state cost: the cipher objects are built once, the payload is
+# already padded and the output buffer is reused, so only encrypt()/decrypt()
+# is inside the timed region
+def steady_cost(algorithm, mode_name, payload, out, min_time):
+    module, key_len = ALGORITHMS[algorithm]
+    key = get_random_bytes(key_len)
+    iv = get_random_bytes(module.block_size)
+    encryptor = pycryptodome_cipher(module, key, mode_name, iv)
+    decryptor = pycryptodome_cipher(module, key, mode_name, iv)
+
+    enc = median_time(lambda: encryptor.encrypt(payload, output=out), min_time)
+    dec = median_time(lambda: decryptor.decrypt(payload, output=out), min_time)
+    return enc, dec
+
+def run(algorithms, mode_names, sizes, min_time):
+    setup = {}
+    for mode_name in mode_names:
+        for algorithm in algorithms:
+            if supported(algorithm, mode_name):
+                setup[(algorithm, mode_name)] = setup_cost(algorithm, mode_name, min_time)
+
+    # Sizes are multiples of 16, so no mode needs padding in the timed loop
+    buffer = bytearray(os.urandom(max(sizes)))
+    out = bytearray(len(buffer))
+    rows = []
+    for size in sizes:
+        payload = memoryview(buffer)[:size]
+        dst = memoryview(out)[:size]
+        for mode_name in mode_names:
+            for algorithm in algorithms:
+                if not supported(algorithm, mode_name):
+                    continue
+                enc, dec = steady_cost(algorithm, mode_name, payload, dst, min_time)
+                row = {
+                    "algorithm": algorithm,
+                    "mode": mode_name,
+                    "size": size,
+                    "setup_us": setup[(algorithm, mode_name)] * 1e6,
+                    "encrypt_ns_per_byte": enc * 1e9 / size,
+                    "decrypt_ns_per_byte": dec * 1e9 / size,
+                    "encrypt_mb_s": size / enc / (1024 * 1024),
+                    "decrypt_mb_s": size / dec / (1024 * 1024)
+                }
+                rows.append(row)
+                print(f"{mode_name:>4} {algorithm:>8} {size:>10} B  setup {row['setup_us']:7.2f} us  "
+                      f"enc {row['encrypt_ns_per_byte']:7.3f} ns/B ({row['encrypt_mb_s']:8.1f} MB/s)  "
+                      f"dec {row['decrypt_ns_per_byte']:7.3f} ns/B ({row['decrypt_mb_s']:8.1f} MB/s)")
+    return rows
+
+# Per-byte cost against payload size, one panel per mode, plus setup cost
+def plot(rows, algorithms, mode_names, path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, len(mode_names) + 1, figsize=(4 * (len(mode_names) + 1), 4))
+    for ax, mode_name in zip(axes, mode_names):
+        for algorithm in algorithms:
+            data = [r for r in rows if r["mode"] == mode_name and r["algorithm"] == algorithm]
+            if not data:
+                continue
+            sizes = [r["size"] for r in data]
+            line = ax.plot(sizes, [r["encrypt_ns_per_byte"] for r in data], label=f"{algorithm} enc")[0]
+            ax.plot(sizes, [r["decrypt_ns_per_byte"] for r in data], "--", color=line.get_color(),
+                    label=f"{algorithm} dec")
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_title(mode_name)
+        ax.set_xlabel("Payload (bytes)")
+    axes[0].set_ylabel("Time per byte (ns)")
+    axes[0].legend(fontsize="small")
+
+    ax = axes[-1]
+    x = range(len(mode_names))
+    width = 0.8 / len(algorithms)
+    for i, algorithm in enumerate(algorithms):
+        cost = [next((r["setup_us"] for r in rows if r["mode"] == m and r["algorithm"] == algorithm), 0)
+                for m in mode_names]
+        ax.bar([j + (i - (len(algorithms) - 1) / 2) * width for j in x], cost, width, label=algorithm)
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(mode_names)
+    ax.set_ylabel("Setup (us)")
+    ax.set_title("Cipher construction")
+    ax.legend(fontsize="small")
+
+    plt.tight_layout()
+    plt.savefig(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="DES/AES mode comparison: setup vs steady-state cost")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--modes", nargs="+", choices=list(modes), default=list(modes))
+    parser.add_argument("--min-size", type=parse_size, default=1024)
+    parser.add_argument("--max-size", type=parse_size, default=parse_size("256M"))
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds of timing per point")
+    parser.add_argument("--output", default="encryption_time_comparison.png")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args()
+
+    round_trip(args.modes)
+    # Round up to whole AES blocks; payload_sizes multiplies by 4, so every
+    # size stays a multiple of 16
+    min_size = max(16, -(-args.min_size // 16) * 16)
+    sizes = payload_sizes(min_size, args.max_size)
+    if not sizes:
+        parser.error(f"--max-size must be at least {min_size}")
+    rows = run(args.algorithms, args.modes, sizes, args.min_time)
+    if not args.no_plot:
+        plot(rows, args.algorithms, args.modes, args.output)
+
+if __name__ == "__main__":
+    main()
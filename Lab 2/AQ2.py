@@ -28,11 +28,12 @@ key = "A1B2C3D4E5F60708"
 block1 = "54686973206973206120636f6e666964656e7469616c206d657373616765"
 block2 = "416e64207468697320697320746865207365636f6e6420626c6f636b"
 
-ct1 = encrypt(block1, key)
-ct2 = encrypt(block2, key)
+if __name__ == "__main__":
+    ct1 = encrypt(block1, key)
+    ct2 = encrypt(block2, key)
 
-pt1 = decrypt(ct1, key)
-pt2 = decrypt(ct2, key)
+    pt1 = decrypt(ct1, key)
+    pt2 = decrypt(ct2, key)
 
-print("Block 1 Success:", pt1.decode('utf-8') == bytes.fromhex(block1).decode('utf-8'))
-print("Block 2 Success:", pt2.decode('utf-8') == bytes.fromhex(block2).decode('utf-8'))
+    print("Block 1 Success:", pt1.decode('utf-8') == bytes.fromhex(block1).decode('utf-8'))
+    print("Block 2 Success:", pt2.decode('utf-8') == bytes.fromhex(block2).decode('utf-8'))
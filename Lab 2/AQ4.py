@@ -1,4 +1,5 @@
-from Crypto.Cipher import DES
+import os
+from Crypto.Cipher import AES, DES
 from Crypto.Util.Padding import pad, unpad
 
 def encrypt_cbc(message, key, iv):
@@ -25,11 +26,100 @@ def decrypt_cbc(ct, key, iv):
     print("Decrypted Plaintext:", pt.decode('utf-8'))
     return pt
 
-key = "A1B2C3D4"
-iv = "12345678"
-message = "Secure Communication"
+CHUNK_SIZE = 1 << 20
 
-ct = encrypt_cbc(message, key, iv)
-pt = decrypt_cbc(ct, key, iv)
+ALGORITHMS = {"DES": DES, "AES": AES}
 
-print("Success:", pt.decode('utf-8') == message)
+def cbc_cipher(key, iv, algorithm):
+    module = ALGORITHMS[algorithm]
+    key = key.encode('utf-8')
+    if algorithm == "DES":
+        key = key[:8]
+    iv = iv.encode('utf-8')[:module.block_size]
+    return module.new(key, module.MODE_CBC, iv)
+
+# readinto can return short reads on pipes; keep reading until the view is
+# full or the input ends
+def read_full(src, view):
+    total = 0
+    while total < len(view):
+        n = src.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+def aligned_chunk(chunk_size, block):
+    chunk_size -= chunk_size % block
+    if chunk_size <= 0:
+        raise ValueError(f"Chunk size must be at least the block size ({block} bytes)")
+    return chunk_size
+
+# The CBC object carries the chaining value from one chunk to the next, and
+# chunks are block-aligned, so only the last read is padded. Input and output
+# live in two reused buffers, so memory stays constant for any file size.
+def encrypt_file(in_path, out_path, key, iv, algorithm="DES", chunk_size=CHUNK_SIZE):
+    cipher = cbc_cipher(key, iv, algorithm)
+    block = cipher.block_size
+    chunk_size = aligned_chunk(chunk_size, block)
+    buf = bytearray(chunk_size + block)
+    out = bytearray(chunk_size + block)
+    view, out_view = memoryview(buf), memoryview(out)
+
+    with open(in_path, "rb") as src, open(out_path, "wb") as dst:
+        while True:
+            n = read_full(src, view[:chunk_size])
+            if n < chunk_size:
+                padding = block - n % block
+                buf[n:n + padding] = bytes([padding]) * padding
+                cipher.encrypt(view[:n + padding], output=out_view[:n + padding])
+                dst.write(out_view[:n + padding])
+                break
+            cipher.encrypt(view[:n], output=out_view[:n])
+            dst.write(out_view[:n])
+
+# The last block is held back after every chunk, since the file could end
+# there and padding has to come off it
+def decrypt_file(in_path, out_path, key, iv, algorithm="DES", chunk_size=CHUNK_SIZE):
+    cipher = cbc_cipher(key, iv, algorithm)
+    block = cipher.block_size
+    chunk_size = aligned_chunk(chunk_size, block)
+    buf = bytearray(chunk_size)
+    out = bytearray(chunk_size)
+    view, out_view = memoryview(buf), memoryview(out)
+    last = b""
+
+    with open(in_path, "rb") as src, open(out_path, "wb") as dst:
+        while True:
+            n = read_full(src, view)
+            if n == 0:
+                break
+            if n % block:
+                raise ValueError("Ciphertext length is not a multiple of the block size")
+            cipher.decrypt(view[:n], output=out_view[:n])
+            dst.write(last)
+            dst.write(out_view[:n - block])
+            last = bytes(out_view[n - block:n])
+        if not last:
+            raise ValueError("Ciphertext is empty")
+        dst.write(unpad(last, block))
+
+if __name__ == "__main__":
+    key = "A1B2C3D4"
+    iv = "12345678"
+    message = "Secure Communication"
+
+    ct = encrypt_cbc(message, key, iv)
+    pt = decrypt_cbc(ct, key, iv)
+
+    print("Success:", pt.decode('utf-8') == message)
+
+    for algorithm, file_key, file_iv in (("DES", key, iv), ("AES", "0123456789ABCDEF", "1234567812345678")):
+        with open("aq4_plain.bin", "wb") as f:
+            f.write(os.urandom(3 * CHUNK_SIZE + 5))
+        encrypt_file("aq4_plain.bin", "aq4_cipher.bin", file_key, file_iv, algorithm)
+        decrypt_file("aq4_cipher.bin", "aq4_round.bin", file_key, file_iv, algorithm)
+        with open("aq4_plain.bin", "rb") as a, open("aq4_round.bin", "rb") as b:
+            print(f"{algorithm}-CBC file round trip:", a.read() == b.read())
+        for path in ("aq4_plain.bin", "aq4_cipher.bin", "aq4_round.bin"):
+            os.remove(path)
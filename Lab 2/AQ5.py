@@ -1,3 +1,8 @@
+import mmap
+import os
+import sys
+import time
+from multiprocessing import Pool, cpu_count, shared_memory
 from Crypto.Cipher import AES
 from Crypto.Util import Counter
 
@@ -24,11 +29,111 @@ def decrypt_ctr(ct, key_str, nonce_str):
     print("Decrypted Plaintext:", pt.decode('utf-8'))
     return pt
 
-key = "0123456789ABCDEF0123456789ABCDEF"
-nonce = "00000000"
-message = "Cryptography Lab Exercise"
+WINDOW = 1 << 22
 
-ct = encrypt_ctr(message, key, nonce)
-pt = decrypt_ctr(ct, key, nonce)
+def ctr_params(key_str, nonce_str):
+    return key_str.encode('utf-8')[:32], nonce_str.encode('utf-8')[:8]
 
-print("Success:", pt.decode('utf-8') == message)
+# CTR keystream block i only depends on (nonce, i), so a segment starting at
+# byte offset `start` (a multiple of 16) just starts its counter at start / 16
+def ctr_cipher(key, nonce, start):
+    ctr = Counter.new(64, prefix=nonce, initial_value=start // AES.block_size)
+    return AES.new(key, AES.MODE_CTR, counter=ctr)
+
+def ctr_range(src, dst, key, nonce, start, end):
+    cipher = ctr_cipher(key, nonce, start)
+    for offset in range(start, end, WINDOW):
+        stop = min(offset + WINDOW, end)
+        cipher.encrypt(src[offset:stop], output=dst[offset:stop])
+
+# Split [0, size) into one block-aligned segment per worker
+def segments(size, workers):
+    step = -(-size // workers)
+    step += -step % AES.block_size
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+def file_segment(job):
+    in_path, out_path, key, nonce, start, end = job
+    with open(in_path, "rb") as f_in, open(out_path, "r+b") as f_out:
+        with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as m_in, \
+                mmap.mmap(f_out.fileno(), 0) as m_out:
+            ctr_range(memoryview(m_in), memoryview(m_out), key, nonce, start, end)
+
+def buffer_segment(job):
+    in_name, out_name, key, nonce, start, end = job
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        ctr_range(shm_in.buf, shm_out.buf, key, nonce, start, end)
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+# Encrypt (or decrypt, CTR is symmetric) a file with a process pool; each
+# worker writes its segment straight into the memory-mapped output file
+def encrypt_file_parallel(in_path, out_path, key_str, nonce_str, workers=None):
+    key, nonce = ctr_params(key_str, nonce_str)
+    size = os.path.getsize(in_path)
+    with open(out_path, "wb") as f:
+        f.truncate(size)
+    if not size:
+        return
+    workers = workers or cpu_count()
+    jobs = [(in_path, out_path, key, nonce, start, end) for start, end in segments(size, workers)]
+    with Pool(workers) as pool:
+        pool.map(file_segment, jobs)
+
+# Same for an in-memory buffer, through shared memory blocks
+def encrypt_parallel(data, key_str, nonce_str, workers=None):
+    key, nonce = ctr_params(key_str, nonce_str)
+    size = len(data)
+    if not size:
+        return b""
+    workers = workers or cpu_count()
+    shm_in = shared_memory.SharedMemory(create=True, size=size)
+    shm_out = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm_in.buf[:size] = data
+        jobs = [(shm_in.name, shm_out.name, key, nonce, start, end) for start, end in segments(size, workers)]
+        with Pool(workers) as pool:
+            pool.map(buffer_segment, jobs)
+        return bytes(shm_out.buf[:size])
+    finally:
+        for shm in (shm_in, shm_out):
+            shm.close()
+            shm.unlink()
+
+decrypt_parallel = encrypt_parallel
+decrypt_file_parallel = encrypt_file_parallel
+
+def benchmark(size_mb=256, key_str="0123456789ABCDEF0123456789ABCDEF", nonce_str="00000000"):
+    data = os.urandom(size_mb * 1024 * 1024)
+    key, nonce = ctr_params(key_str, nonce_str)
+    start = time.perf_counter()
+    expected = ctr_cipher(key, nonce, 0).encrypt(data)
+    single = time.perf_counter() - start
+    print(f"{size_mb} MB, single stream: {size_mb / single:.0f} MB/s")
+    for workers in range(1, cpu_count() + 1):
+        start = time.perf_counter()
+        ct = encrypt_parallel(data, key_str, nonce_str, workers)
+        elapsed = time.perf_counter() - start
+        assert ct == expected
+        print(f"{workers} worker(s): {size_mb / elapsed:.0f} MB/s ({single / elapsed:.2f}x)")
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+    key = "0123456789ABCDEF0123456789ABCDEF"
+    nonce = "00000000"
+    message = "Cryptography Lab Exercise"
+
+    ct = encrypt_ctr(message, key, nonce)
+    pt = decrypt_ctr(ct, key, nonce)
+
+    print("Success:", pt.decode('utf-8') == message)
+
+    data = os.urandom(5 * 1024 * 1024 + 3)
+    ct = encrypt_parallel(data, key, nonce)
+    print("Parallel CTR matches single stream:", ct == ctr_cipher(*ctr_params(key, nonce), 0).encrypt(data))
+    print("Parallel CTR round trip:", decrypt_parallel(ct, key, nonce) == data)
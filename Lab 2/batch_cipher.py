@@ -0,0 +1,225 @@
+import sys
+import time
+import numpy as np
+from Crypto.Cipher import AES, DES
+from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import pad
+from cipher_cache import get_cipher
+
+ALGORITHMS = {"AES": AES, "DES": DES}
+
+# Records are processed this many at a time so the index arrays stay small
+# however long the batch is
+GROUP = 1 << 15
+
+
+# Size of a record after PKCS#7 padding (CBC) or unchanged (CTR)
+def record_sizes(records, algorithm="AES", mode="CBC"):
+    lengths = np.fromiter((len(r) for r in records), dtype=np.int64, count=len(records))
+    if mode == "CBC":
+        block = ALGORITHMS[algorithm].block_size
+        lengths = (lengths // block + 1) * block
+    return lengths
+
+def record_offsets(sizes):
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return offsets
+
+def output_size(records, algorithm="AES", mode="CBC"):
+    return int(record_sizes(records, algorithm, mode).sum())
+
+# One IV per record for CBC, one nonce of half a block per record for CTR
+# (the other half is the block counter, as in pycryptodome's default layout)
+def iv_size(algorithm="AES", mode="CBC"):
+    block = ALGORITHMS[algorithm].block_size
+    return block if mode == "CBC" else block // 2
+
+def random_ivs(count, algorithm="AES", mode="CBC"):
+    return get_random_bytes(count * iv_size(algorithm, mode))
+
+def check_mode(algorithm, mode):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm}")
+    if mode not in ("CBC", "CTR"):
+        raise ValueError("Batch mode must be CBC or CTR")
+
+def iv_rows(ivs, count, algorithm, mode):
+    size = iv_size(algorithm, mode)
+    rows = np.frombuffer(ivs, dtype=np.uint8)
+    if len(rows) != count * size:
+        raise ValueError(f"Expected {count} IVs of {size} bytes")
+    return rows.reshape(count, size)
+
+def output_view(output, size):
+    if output is None:
+        output = bytearray(size)
+    if len(output) < size:
+        raise ValueError(f"Output buffer needs at least {size} bytes")
+    return output, np.frombuffer(output, dtype=np.uint8, count=size)
+
+# Scatter records into their slots of a flat buffer. For CBC every slot is
+# first filled with its padding byte, then the record bytes overwrite the front.
+def pack_records(records, sizes, block=None):
+    flat = np.frombuffer(b"".join(records), dtype=np.uint8)
+    lengths = np.fromiter((len(r) for r in records), dtype=np.int64, count=len(records))
+    if block is None:
+        return flat.copy()
+    buf = np.repeat((sizes - lengths).astype(np.uint8), sizes)
+    starts = record_offsets(sizes)[:-1]
+    dest = np.arange(len(flat)) + np.repeat(starts - record_offsets(lengths)[:-1], lengths)
+    buf[dest] = flat
+    return buf
+
+# CBC is sequential inside a record but independent across records, so block
+# j of every record that has one is encrypted in a single ECB call.
+def cbc_encrypt_group(ecb, data, ivs, sizes, block, out):
+    rows = data.reshape(-1, block)
+    out_rows = out.reshape(-1, block)
+    first = record_offsets(sizes // block)[:-1]
+    nblocks = sizes // block
+    scratch = bytearray(len(sizes) * block)
+    for j in range(int(nblocks.max(initial=0))):
+        live = np.nonzero(nblocks > j)[0]
+        index = first[live] + j
+        prev = ivs[live] if j == 0 else out_rows[index - 1]
+        x = np.bitwise_xor(rows[index], prev)
+        view = memoryview(scratch)[:len(live) * block]
+        ecb.encrypt(memoryview(x.reshape(-1)), output=view)
+        out_rows[index] = np.frombuffer(view, dtype=np.uint8).reshape(-1, block)
+
+# Counter blocks nonce_i || j for every block of every record go through one
+# ECB call; the keystream is then gathered back to the unpadded record bytes.
+def ctr_group(ecb, data, nonces, lengths, block, out):
+    nblocks = -(-lengths // block)
+    total = int(nblocks.sum())
+    counters = np.zeros((total, block), dtype=np.uint8)
+    counters[:, :nonces.shape[1]] = np.repeat(nonces, nblocks, axis=0)
+    first = record_offsets(nblocks)
+    j = np.arange(total, dtype=np.int64) - np.repeat(first[:-1], nblocks)
+    half = block - nonces.shape[1]
+    counters[:, nonces.shape[1]:] = j.astype(">u8").view(np.uint8).reshape(-1, 8)[:, 8 - half:]
+    stream = bytearray(total * block)
+    ecb.encrypt(memoryview(counters.reshape(-1)), output=stream)
+
+    starts = record_offsets(lengths)[:-1]
+    index = np.arange(len(data), dtype=np.int64) + np.repeat(first[:-1] * block - starts, lengths)
+    np.bitwise_xor(data, np.frombuffer(stream, dtype=np.uint8)[index], out=out)
+
+def encrypt_batch(records, key, ivs, algorithm="AES", mode="CBC", output=None):
+    """Encrypt many short byte records under one key and a per-record IV (CBC)
+    or nonce (CTR). The key schedule is built once. Record i of the result is
+    output[offsets[i]:offsets[i + 1]]; returns (output, offsets)."""
+    check_mode(algorithm, mode)
+    block = ALGORITHMS[algorithm].block_size
+    ivs = iv_rows(ivs, len(records), algorithm, mode)
+    sizes = record_sizes(records, algorithm, mode)
+    offsets = record_offsets(sizes)
+    output, out = output_view(output, int(offsets[-1]))
+    ecb = get_cipher(algorithm, key, ALGORITHMS[algorithm].MODE_ECB)
+
+    for g in range(0, len(records), GROUP):
+        group = records[g:g + GROUP]
+        group_sizes = sizes[g:g + GROUP]
+        dst = out[offsets[g]:offsets[g + len(group)]]
+        if mode == "CBC":
+            data = pack_records(group, group_sizes, block)
+            cbc_encrypt_group(ecb, data, ivs[g:g + GROUP], group_sizes, block, dst)
+        else:
+            ctr_group(ecb, pack_records(group, group_sizes), ivs[g:g + GROUP], group_sizes, block, dst)
+    return output, offsets
+
+def decrypt_batch(data, offsets, key, ivs, algorithm="AES", mode="CBC", output=None):
+    """Inverse of encrypt_batch. Plaintext record i is
+    output[offsets[i]:offsets[i] + lengths[i]]; returns (output, lengths)."""
+    check_mode(algorithm, mode)
+    block = ALGORITHMS[algorithm].block_size
+    offsets = np.asarray(offsets, dtype=np.int64)
+    sizes = np.diff(offsets)
+    ivs = iv_rows(ivs, len(sizes), algorithm, mode)
+    total = int(offsets[-1])
+    output, out = output_view(output, total)
+    src = np.frombuffer(data, dtype=np.uint8, count=total)
+    ecb = get_cipher(algorithm, key, ALGORITHMS[algorithm].MODE_ECB)
+
+    if mode == "CTR":
+        for g in range(0, len(sizes), GROUP):
+            lo, hi = offsets[g], offsets[min(g + GROUP, len(sizes))]
+            ctr_group(ecb, src[lo:hi], ivs[g:g + GROUP], sizes[g:g + GROUP], block, out[lo:hi])
+        return output, sizes
+
+    # CBC decryption has no chain dependency: P_j = D(C_j) xor C_(j-1)
+    if np.any(sizes <= 0) or np.any(sizes % block):
+        raise ValueError("Ciphertext records must be non-empty multiples of the block size")
+    ecb.decrypt(memoryview(data)[:total], output=memoryview(output)[:total])
+    rows = out.reshape(-1, block)
+    prev = np.empty_like(rows)
+    prev[1:] = src.reshape(-1, block)[:-1]
+    prev[offsets[:-1] // block] = ivs
+    rows ^= prev
+
+    padding = out[offsets[1:] - 1].astype(np.int64)
+    if np.any(padding < 1) or np.any(padding > block):
+        raise ValueError("Padding is incorrect.")
+    index = np.repeat(offsets[1:], padding) - 1 - (np.arange(int(padding.sum())) -
+                                                     np.repeat(record_offsets(padding)[:-1], padding))
+    if np.any(out[index] != np.repeat(padding, padding)):
+        raise ValueError("Padding is incorrect.")
+    return output, sizes - padding
+
+def split(output, offsets, lengths=None):
+    view = memoryview(output)
+    if lengths is None:
+        lengths = np.diff(offsets)
+    return [bytes(view[o:o + n]) for o, n in zip(offsets[:-1].tolist(), lengths.tolist())]
+
+
+def per_record(records, key, ivs, algorithm, mode):
+    module = ALGORITHMS[algorithm]
+    size = iv_size(algorithm, mode)
+    out = []
+    for i, record in enumerate(records):
+        iv = ivs[i * size:(i + 1) * size]
+        if mode == "CBC":
+            out.append(module.new(key, module.MODE_CBC, iv).encrypt(pad(record, module.block_size)))
+        else:
+            out.append(module.new(key, module.MODE_CTR, nonce=iv).encrypt(record))
+    return out
+
+def benchmark(count=200000):
+    rng = np.random.default_rng(7)
+    records = [rng.bytes(int(n)) for n in rng.integers(20, 201, count)]
+    keys = {"AES": b"0123456789ABCDEF0123456789ABCDEF", "DES": b"A1B2C3D4"}
+    print(f"{count} records of 20-200 bytes")
+    print(f"{'Cipher':>8} {'per record':>12} {'batch':>10} {'speedup':>9}")
+    for algorithm, key in keys.items():
+        for mode in ("CBC", "CTR"):
+            ivs = random_ivs(count, algorithm, mode)
+            output = bytearray(output_size(records, algorithm, mode))
+
+            start = time.perf_counter()
+            expected = per_record(records, key, ivs, algorithm, mode)
+            before = time.perf_counter() - start
+
+            start = time.perf_counter()
+            _, offsets = encrypt_batch(records, key, ivs, algorithm, mode, output=output)
+            after = time.perf_counter() - start
+
+            assert split(output, offsets) == expected
+            plain, lengths = decrypt_batch(output, offsets, key, ivs, algorithm, mode)
+            assert split(plain, offsets, lengths) == records
+            print(f"{algorithm + '-' + mode:>8} {before:>11.3f}s {after:>9.3f}s {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        key = b"0123456789ABCDEF"
+        records = [b"Patient record 00042", b"x" * 16, b"", b"A longer record that spans several blocks of AES"]
+        for mode in ("CBC", "CTR"):
+            ivs = random_ivs(len(records), "AES", mode)
+            ct, offsets = encrypt_batch(records, key, ivs, "AES", mode)
+            assert split(ct, offsets) == per_record(records, key, ivs, "AES", mode)
+            pt, lengths = decrypt_batch(ct, offsets, key, ivs, "AES", mode)
+            print(f"AES-{mode} offsets {offsets.tolist()} round trip:", split(pt, offsets, lengths) == records)
@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from Crypto.Cipher import AES, DES, DES3
+from Crypto.Util.Padding import pad
+
+ALGORITHMS = {"AES": AES, "DES": DES, "DES3": DES3}
+
+
+# Bounded LRU of ready-made cipher objects, so the key schedule runs once per
+# key instead of once per call. Only ECB objects are cached: they keep no
+# state between calls, while CBC/CFB/OFB/CTR objects carry an IV or counter
+# and must not be shared between messages.
+class CipherCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, algorithm, key, mode):
+        if mode != ALGORITHMS[algorithm].MODE_ECB:
+            raise ValueError("Only stateless ECB cipher objects can be cached")
+        cache_key = (algorithm, key, mode)
+        cipher = self.entries.get(cache_key)
+        if cipher is not None:
+            self.hits += 1
+            self.entries.move_to_end(cache_key)
+            return cipher
+
+        self.misses += 1
+        cipher = ALGORITHMS[algorithm].new(key, mode)
+        self.entries[cache_key] = cipher
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return cipher
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+CACHE = CipherCache()
+
+def get_cipher(algorithm, key, mode):
+    return CACHE.get(algorithm, key, mode)
+
+
+def ops_per_sec(func, seconds=0.5):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            func()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def benchmark():
+    message = pad(b"Patient record 00042", 16)
+    keys = {"DES": b"A1B2C3D4", "DES3": b"0123456789ABCDEFFEDCBA98", "AES": b"0123456789ABCDEF0123456789ABCDEF"}
+    print(f"{'Algorithm':>10} {'new() ops/s':>13} {'cached ops/s':>13} {'speedup':>9}")
+    for algorithm, key in keys.items():
+        module = ALGORITHMS[algorithm]
+        data = message[:len(message) - len(message) % module.block_size]
+        before = ops_per_sec(lambda: module.new(key, module.MODE_ECB).encrypt(data))
+        after = ops_per_sec(lambda: get_cipher(algorithm, key, module.MODE_ECB).encrypt(data))
+        print(f"{algorithm:>10} {before:>13,.0f} {after:>13,.0f} {after / before:>8.1f}x")
+    print("Cache:", CACHE.stats())
+
+
+if __name__ == "__main__":
+    benchmark()
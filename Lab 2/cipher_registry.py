@@ -0,0 +1,288 @@
+import json
+import os
+import platform
+import sys
+import time
+import Crypto
+from Crypto.Cipher import AES, DES
+from reference_cipher import AESBlock, DESBlock, ReferenceCipher
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes as crypto_modes
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import TripleDES
+    except ImportError:
+        TripleDES = algorithms.TripleDES
+    from cryptography.exceptions import InvalidTag
+    import cryptography
+except ImportError:
+    cryptography = None
+
+MODE_NAMES = ["ECB", "CBC", "CFB", "OFB", "CTR", "GCM"]
+MODULES = {"DES": DES, "AES": AES}
+CACHE_PATH = os.environ.get("LAB2_BACKEND_CACHE",
+                            os.path.join(os.path.expanduser("~"), ".cache", "is_lab", "cipher_backends.json"))
+
+# (algorithm, mode) -> {backend name: factory(key, mode_name, iv)}. Every
+# factory returns an object with block_size and stateful encrypt()/decrypt()
+# that behaves like DES.new/AES.new in AQ1.py.
+REGISTRY = {}
+
+def register(backend, algorithms_, mode_names):
+    def wrap(factory):
+        for algorithm in algorithms_:
+            for mode_name in mode_names:
+                REGISTRY.setdefault((algorithm, mode_name), {})[backend] = factory
+        return factory
+    return wrap
+
+def backends(algorithm, mode_name):
+    return list(REGISTRY.get((algorithm, mode_name), {}))
+
+
+def pycryptodome_cipher(module, key, mode_name, iv, **options):
+    mode = getattr(module, "MODE_" + mode_name)
+    if mode_name == "ECB":
+        return module.new(key, mode, **options)
+    if mode_name == "CTR":
+        return module.new(key, mode, nonce=iv[:module.block_size // 2], **options)
+    if mode_name == "GCM":
+        return module.new(key, mode, nonce=iv, **options)
+    return module.new(key, mode, iv, **options)
+
+@register("pycryptodome", ["DES"], MODE_NAMES[:5])
+def pycryptodome_des(key, mode_name, iv):
+    return pycryptodome_cipher(DES, key, mode_name, iv)
+
+@register("pycryptodome", ["AES"], MODE_NAMES)
+def pycryptodome_aes(key, mode_name, iv):
+    return pycryptodome_cipher(AES, key, mode_name, iv)
+
+@register("pycryptodome-noaesni", ["AES"], MODE_NAMES)
+def pycryptodome_aes_portable(key, mode_name, iv):
+    return pycryptodome_cipher(AES, key, mode_name, iv, use_aesni=False)
+
+@register("reference", ["DES"], MODE_NAMES[:5])
+def reference_des(key, mode_name, iv):
+    return ReferenceCipher(DESBlock(key), mode_name, iv if mode_name != "CTR" else iv[:4])
+
+@register("reference", ["AES"], MODE_NAMES[:5])
+def reference_aes(key, mode_name, iv):
+    return ReferenceCipher(AESBlock(key), mode_name, iv if mode_name != "CTR" else iv[:8])
+
+
+# The cryptography package splits a cipher into one-way encryptor/decryptor
+# contexts; this keeps the pycryptodome shape on top of them. CFB is CFB8 and
+# CTR starts from nonce || zeros, matching pycryptodome's defaults. GCM tags
+# go through encrypt_and_digest()/decrypt_and_verify() as in pycryptodome.
+class CryptographyCipher:
+    def __init__(self, algorithm, key, mode_name, iv):
+        self.block_size = algorithm.block_size // 8
+        half = self.block_size // 2
+        mode = {
+            "ECB": lambda: crypto_modes.ECB(),
+            "CBC": lambda: crypto_modes.CBC(iv),
+            "CFB": lambda: crypto_modes.CFB8(iv),
+            "OFB": lambda: crypto_modes.OFB(iv),
+            "CTR": lambda: crypto_modes.CTR(iv[:half] + bytes(half)),
+            "GCM": lambda: crypto_modes.GCM(iv),
+        }[mode_name]()
+        self.cipher = Cipher(algorithm, mode)
+        self.encryptor = None
+        self.decryptor = None
+
+    def encrypt(self, data):
+        if self.encryptor is None:
+            self.encryptor = self.cipher.encryptor()
+        return self.encryptor.update(data)
+
+    def decrypt(self, data):
+        if self.decryptor is None:
+            self.decryptor = self.cipher.decryptor()
+        return self.decryptor.update(data)
+
+    def encrypt_and_digest(self, data):
+        ct = self.encrypt(data)
+        self.encryptor.finalize()
+        return ct, self.encryptor.tag
+
+    def decrypt_and_verify(self, data, tag):
+        pt = self.decrypt(data)
+        try:
+            self.decryptor.finalize_with_tag(tag)
+        except InvalidTag:
+            raise ValueError("MAC check failed")
+        return pt
+
+if cryptography is not None:
+    @register("cryptography", ["DES"], MODE_NAMES[:4])
+    def cryptography_des(key, mode_name, iv):
+        return CryptographyCipher(TripleDES(key), key, mode_name, iv)
+
+    @register("cryptography", ["AES"], MODE_NAMES)
+    def cryptography_aes(key, mode_name, iv):
+        return CryptographyCipher(algorithms.AES(key), key, mode_name, iv)
+
+
+# CPU model and whether it has AES instructions. platform.processor() is
+# empty on Linux, so /proc/cpuinfo is read there; elsewhere fall back to
+# what platform reports (aes then stays unknown).
+def cpu_id():
+    try:
+        with open("/proc/cpuinfo") as f:
+            info = f.read()
+    except OSError:
+        return platform.processor() or platform.platform(), None
+    model, flags = "", ""
+    for line in info.splitlines():
+        name, _, value = line.partition(":")
+        name = name.strip()
+        if name in ("model name", "Processor", "cpu model") and not model:
+            model = value.strip()
+        elif name in ("flags", "Features") and not flags:
+            flags = value.split()
+    return model or platform.processor() or platform.machine(), "aes" in flags
+
+# What a cached choice depends on: a new CPU, interpreter or library version
+# (or a backend appearing) triggers a fresh calibration
+def host_id():
+    cpu, aes = cpu_id()
+    return {
+        "machine": platform.machine(),
+        "cpu": cpu,
+        "aes": aes,
+        "python": platform.python_version(),
+        "pycryptodome": Crypto.__version__,
+        "cryptography": cryptography.__version__ if cryptography else None,
+    }
+
+# Key sizes calibrated separately: AES-192/256 run more rounds than AES-128,
+# so the ranking is not assumed to carry over
+KEY_SIZES = {"DES": [8], "AES": [16, 24, 32]}
+DEFAULT_BACKEND = "pycryptodome"
+# Another backend replaces the default only when it is this much faster
+MARGIN = 0.10
+# Backends this many times slower than the default on a short screening run
+# are not timed further (the pure-Python reference, typically)
+SCREEN_FACTOR = 20
+
+def choice_name(algorithm, key_len, mode_name):
+    if algorithm == "AES":
+        return f"AES-{8 * key_len}-{mode_name}"
+    return f"{algorithm}-{mode_name}"
+
+def choice_names():
+    return {choice_name(a, n, m) for a, m in REGISTRY for n in KEY_SIZES[a]}
+
+# Steady-state seconds per byte: the cipher objects are built once, outside
+# the timed region, and the result is the median of several encrypt+decrypt
+# passes over the payload
+def time_backend(factory, key, mode_name, iv, data, repeats=5):
+    encryptor = factory(key, mode_name, iv)
+    decryptor = factory(key, mode_name, iv)
+    encryptor.encrypt(data)
+    decryptor.decrypt(data)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encryptor.encrypt(data)
+        decryptor.decrypt(data)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] / len(data)
+
+def check_backend(factory, key, mode_name, iv, data, expected):
+    ct = factory(key, mode_name, iv).encrypt(data)
+    pt = factory(key, mode_name, iv).decrypt(ct)
+    return ct == expected and pt == data
+
+# Time every backend of every (algorithm, key size, mode) and keep the
+# default unless another one beats it by MARGIN. A backend whose output
+# differs from pycryptodome's is never picked.
+def calibrate(size=1 << 16, repeats=5, verbose=False):
+    data = os.urandom(size)
+    sample = data[:256]
+    iv = os.urandom(16)
+    choices = {}
+    for (algorithm, mode_name), factories in sorted(REGISTRY.items()):
+        block_iv = iv[:MODULES[algorithm].block_size]
+        for key_len in KEY_SIZES[algorithm]:
+            name = choice_name(algorithm, key_len, mode_name)
+            key = os.urandom(key_len)
+            default = factories[DEFAULT_BACKEND]
+            expected = default(key, mode_name, block_iv).encrypt(sample)
+            screen = time_backend(default, key, mode_name, block_iv, sample, 1)
+            timings = {DEFAULT_BACKEND: time_backend(default, key, mode_name, block_iv, data, repeats)}
+            for backend, factory in factories.items():
+                if backend == DEFAULT_BACKEND:
+                    continue
+                try:
+                    if not check_backend(factory, key, mode_name, block_iv, sample, expected):
+                        if verbose:
+                            print(f"{name} {backend}: output mismatch, skipped")
+                        continue
+                    if time_backend(factory, key, mode_name, block_iv, sample, 1) > SCREEN_FACTOR * screen:
+                        if verbose:
+                            print(f"{name} {backend}: over {SCREEN_FACTOR}x slower than {DEFAULT_BACKEND}, skipped")
+                        continue
+                    timings[backend] = time_backend(factory, key, mode_name, block_iv, data, repeats)
+                except Exception as exc:
+                    if verbose:
+                        print(f"{name} {backend}: failed ({exc})")
+            best = min(timings, key=timings.get)
+            if timings[best] > (1 - MARGIN) * timings[DEFAULT_BACKEND]:
+                best = DEFAULT_BACKEND
+            choices[name] = best
+            if verbose:
+                ranked = ", ".join(f"{b} {1 / t / 2 ** 20:.1f} MB/s"
+                                   for b, t in sorted(timings.items(), key=lambda kv: kv[1]))
+                print(f"{name:>12}: {best:<22} ({ranked})")
+    return choices
+
+def save_choices(choices, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"host": host_id(), "choices": choices}, f, indent=2)
+
+def load_choices(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("host") != host_id():
+        return None
+    return cached.get("choices")
+
+CHOICES = None
+
+# Chosen backends, from the on-disk cache when it matches this host,
+# otherwise from a calibration run that is then written back
+def choices():
+    global CHOICES
+    if CHOICES is None:
+        CHOICES = load_choices()
+        if CHOICES is None or set(CHOICES) != choice_names():
+            CHOICES = calibrate()
+            try:
+                save_choices(CHOICES)
+            except OSError:
+                pass
+    return CHOICES
+
+def new_cipher(algorithm, key, mode_name, iv=None, backend=None):
+    factories = REGISTRY.get((algorithm, mode_name))
+    if factories is None:
+        raise ValueError(f"No backend implements {algorithm}-{mode_name}")
+    if backend is None:
+        # A key length with no calibrated choice is invalid; the default
+        # backend raises the usual ValueError for it
+        backend = choices().get(choice_name(algorithm, len(key), mode_name), DEFAULT_BACKEND)
+    return factories[backend](key, mode_name, iv)
+
+
+if __name__ == "__main__":
+    print("Backends:", ", ".join(sorted({b for f in REGISTRY.values() for b in f})))
+    found = calibrate(verbose=True)
+    if "--save" in sys.argv:
+        save_choices(found)
+        print("Saved to", CACHE_PATH)
@@ -0,0 +1,136 @@
+import argparse
+import time
+from multiprocessing import Event, Pool, cpu_count
+import numpy as np
+from Crypto.Cipher import DES
+from Crypto.Util.Padding import pad
+from AQ2 import block1, key as aq2_key
+
+BATCH = 1 << 16
+CHECK_EVERY = 4096
+
+
+# DES only uses the top 7 bits of each key byte; the low bit is parity. A key
+# is handled as its 56 effective bits, so the 256 parity variants of a key
+# are never tried separately.
+def effective_bits(key):
+    value = 0
+    for byte in key:
+        value = (value << 7) | (byte >> 1)
+    return value
+
+def keys_from_effective(values):
+    values = np.asarray(values, dtype=np.uint64)
+    keys = np.empty((len(values), 8), dtype=np.uint8)
+    for j in range(8):
+        keys[:, j] = ((values >> np.uint64(7 * (7 - j))) & np.uint64(0x7F)) << np.uint64(1)
+    return keys
+
+# The subspace: the low `bits` effective bits are searched, the rest come
+# from base_key
+def subspace(base_key, bits):
+    fixed = effective_bits(base_key) & ~((1 << bits) - 1)
+    return fixed, 1 << bits
+
+
+def init_worker(event):
+    global FOUND
+    FOUND = event
+
+# Try one batch of candidates: the first known block must match, and a
+# second block (when given) rules out a false positive
+def search_batch(job):
+    fixed, start, count, pairs = job
+    if FOUND.is_set():
+        return start, 0, None
+    keys = keys_from_effective(fixed | np.arange(start, start + count, dtype=np.uint64)).tobytes()
+    (pt, ct), rest = pairs[0], pairs[1:]
+    for i in range(count):
+        if i % CHECK_EVERY == 0 and i and FOUND.is_set():
+            return start, i, None
+        key = keys[8 * i:8 * i + 8]
+        if DES.new(key, DES.MODE_ECB).encrypt(pt) == ct:
+            cipher = DES.new(key, DES.MODE_ECB)
+            if all(cipher.encrypt(p) == c for p, c in rest):
+                FOUND.set()
+                return start, i + 1, key
+    return start, count, None
+
+def known_pairs(plaintext, ciphertext, blocks=2):
+    return [(plaintext[i:i + 8], ciphertext[i:i + 8]) for i in range(0, min(len(ciphertext), 8 * blocks), 8)]
+
+# Fan batches out over a process pool. Results come back per batch, which
+# drives the progress line; the first match sets the shared event so every
+# worker drops its remaining work, and the pool is torn down.
+def search(pairs, base_key, bits, workers=None, batch=BATCH, progress=True):
+    fixed, total = subspace(base_key, bits)
+    batch = min(batch, total)
+    jobs = [(fixed, start, min(batch, total - start), pairs) for start in range(0, total, batch)]
+    event = Event()
+    tried = 0
+    found = None
+    last = start = time.perf_counter()
+    with Pool(workers or cpu_count(), initializer=init_worker, initargs=(event,)) as pool:
+        for _, count, key in pool.imap_unordered(search_batch, jobs):
+            tried += count
+            now = time.perf_counter()
+            if progress and (now - last > 1 or key):
+                last = now
+                print(f"\r{tried:,}/{total:,} keys ({100 * tried / total:5.1f}%), "
+                      f"{tried / (now - start):,.0f} keys/s", end="", flush=True)
+            if key:
+                found = key
+                pool.terminate()
+                break
+    elapsed = time.perf_counter() - start
+    if progress:
+        print()
+    return found, tried, elapsed
+
+# keys/s for 1..cores workers over the same subspace, with no key to find
+def scaling(bits=16, max_workers=None):
+    pairs = [(b"\x00" * 8, b"\xff" * 8)]
+    base = b"\x00" * 8
+    one = None
+    for workers in range(1, (max_workers or cpu_count()) + 1):
+        _, tried, elapsed = search(pairs, base, bits, workers, batch=1 << 12, progress=False)
+        rate = tried / elapsed
+        one = one or rate
+        print(f"{workers} worker(s): {rate:>10,.0f} keys/s ({rate / one:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Exhaustive DES key search over a reduced key space")
+    parser.add_argument("--bits", type=int, default=20, help="effective key bits to search (up to 56)")
+    parser.add_argument("--plaintext", help="known plaintext (hex), default AQ2's block1")
+    parser.add_argument("--ciphertext", help="known ciphertext (hex), default AQ2's block1 under its key")
+    parser.add_argument("--base-key", help="key (hex) providing the fixed high bits, default AQ2's key")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument("--scaling", action="store_true", help="report keys/s for 1..cores workers")
+    args = parser.parse_args()
+
+    if args.scaling:
+        scaling()
+        return
+
+    if args.plaintext and args.ciphertext:
+        plaintext, ciphertext = bytes.fromhex(args.plaintext), bytes.fromhex(args.ciphertext)
+        base_key = bytes.fromhex(args.base_key) if args.base_key else bytes(8)
+    else:
+        # AQ2's pair: block1 under DES-ECB with the key's first 8 bytes
+        real_key = aq2_key[:8].encode('utf-8')
+        plaintext = pad(bytes.fromhex(block1), DES.block_size)
+        ciphertext = DES.new(real_key, DES.MODE_ECB).encrypt(plaintext)
+        base_key = bytes.fromhex(args.base_key) if args.base_key else real_key
+
+    pairs = known_pairs(plaintext, ciphertext)
+    print(f"Searching 2^{args.bits} keys with {args.workers or cpu_count()} worker(s)")
+    key, tried, elapsed = search(pairs, base_key, args.bits, args.workers, args.batch)
+    if key:
+        print(f"Key found: {key.hex()} ({key!r}) after {tried:,} keys in {elapsed:.2f}s")
+    else:
+        print(f"No key in the subspace ({tried:,} keys in {elapsed:.2f}s)")
+    print(f"{tried / elapsed:,.0f} keys/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+import numpy as np
+from Crypto.Cipher import DES
+from Crypto.Util.Padding import pad
+from question1 import des_cipher
+from des_keysearch import effective_bits, keys_from_effective, subspace
+
+CHUNK = 1 << 16
+ENTRY_BYTES = 12  # 8-byte intermediate + 4-byte key index
+
+
+# Double DES with question1's cipher: C = E_k2(E_k1(P))
+def double_des_en(ptext, key1, key2):
+    inner = des_cipher(key1).encrypt(pad(ptext.encode('utf-8'), DES.block_size))
+    return des_cipher(key2).encrypt(inner)
+
+# Intermediates for a run of candidate keys as big-endian uint64: forward
+# E_k1(P) for the first key, backward D_k2(C) for the second
+def intermediates(fixed, start, count, block, backward=False):
+    keys = keys_from_effective(fixed | np.arange(start, start + count, dtype=np.uint64)).tobytes()
+    out = bytearray(8 * count)
+    for i in range(count):
+        cipher = DES.new(keys[8 * i:8 * i + 8], DES.MODE_ECB)
+        out[8 * i:8 * i + 8] = cipher.decrypt(block) if backward else cipher.encrypt(block)
+    return np.frombuffer(out, dtype=">u8").astype(np.uint64)
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Forward table split by the top bits of the intermediate. With one partition
+# it stays in memory; otherwise every chunk is appended to per-partition
+# files, and each partition (sized to fit the budget) is sorted on its own
+# into a memory-mapped file. Lookups only ever hold one partition.
+class ForwardTable:
+    def __init__(self, entries, memory, workdir):
+        self.parts = 1
+        while entries * ENTRY_BYTES * 2 / self.parts > memory:
+            self.parts *= 2
+        self.shift = np.uint64(64 - (self.parts.bit_length() - 1))
+        self.workdir = workdir
+        self.mids, self.index = [], []
+        if self.parts > 1:
+            self.files = [(open(self.path(p, "mid"), "wb"), open(self.path(p, "idx"), "wb")) for p in range(self.parts)]
+
+    def path(self, part, kind, prefix="fwd"):
+        return os.path.join(self.workdir, f"{prefix}_{part:04d}.{kind}")
+
+    def partition(self, mids):
+        if self.parts == 1:
+            return np.zeros(len(mids), dtype=np.int64)
+        return (mids >> self.shift).astype(np.int64)
+
+    def add(self, mids, start):
+        index = np.arange(start, start + len(mids), dtype=np.uint32)
+        if self.parts == 1:
+            self.mids.append(mids)
+            self.index.append(index)
+            return
+        part = self.partition(mids)
+        order = np.argsort(part, kind="stable")
+        bounds = np.searchsorted(part[order], np.arange(self.parts + 1))
+        for p in range(self.parts):
+            sel = order[bounds[p]:bounds[p + 1]]
+            self.files[p][0].write(mids[sel].tobytes())
+            self.files[p][1].write(index[sel].tobytes())
+
+    def finish(self):
+        if self.parts == 1:
+            mids, index = np.concatenate(self.mids), np.concatenate(self.index)
+            order = np.argsort(mids)
+            self.table = (mids[order], index[order])
+            self.mids = self.index = None
+            return
+        for mid_file, idx_file in self.files:
+            mid_file.close()
+            idx_file.close()
+        for p in range(self.parts):
+            mids = np.fromfile(self.path(p, "mid"), dtype=np.uint64)
+            index = np.fromfile(self.path(p, "idx"), dtype=np.uint32)
+            order = np.argsort(mids)
+            mids[order].tofile(self.path(p, "mid"))
+            index[order].tofile(self.path(p, "idx"))
+
+    def load(self, p):
+        if self.parts == 1:
+            return self.table
+        return (np.memmap(self.path(p, "mid"), dtype=np.uint64, mode="r"),
+                np.memmap(self.path(p, "idx"), dtype=np.uint32, mode="r"))
+
+# Every forward entry whose intermediate equals one of the backward ones:
+# a vectorised searchsorted finds the run of equal values for each probe
+def probe(table_mids, table_index, mids, index):
+    left = np.searchsorted(table_mids, mids, side="left")
+    right = np.searchsorted(table_mids, mids, side="right")
+    counts = right - left
+    hit = counts > 0
+    if not hit.any():
+        return []
+    starts, counts, probes = left[hit], counts[hit], index[hit]
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    firsts = table_index[np.repeat(starts, counts) + offsets]
+    return list(zip(firsts.tolist(), np.repeat(probes, counts).tolist()))
+
+def attack(pairs, base1, base2, bits, memory=256 << 20, workdir=None, chunk=CHUNK):
+    (pt, ct), rest = pairs[0], pairs[1:]
+    fixed1, total = subspace(base1, bits)
+    fixed2, _ = subspace(base2, bits)
+    workdir = tempfile.mkdtemp(prefix="mitm_", dir=workdir)
+    stats = {"keys": total, "bits": bits}
+    try:
+        table = ForwardTable(total, memory, workdir)
+        stats["partitions"] = table.parts
+
+        start = time.perf_counter()
+        for s in range(0, total, chunk):
+            table.add(intermediates(fixed1, s, min(chunk, total - s), pt), s)
+        table.finish()
+        stats["forward_s"] = time.perf_counter() - start
+
+        # Backward intermediates are bucketed the same way, so each forward
+        # partition is loaded once and probed with its own backward entries
+        start = time.perf_counter()
+        candidates = []
+        spilled = [False] * table.parts
+        for s in range(0, total, chunk):
+            mids = intermediates(fixed2, s, min(chunk, total - s), ct, backward=True)
+            index = np.arange(s, s + len(mids), dtype=np.uint32)
+            if table.parts == 1:
+                candidates += probe(*table.load(0), mids, index)
+                continue
+            part = table.partition(mids)
+            for p in np.unique(part).tolist():
+                sel = part == p
+                with open(table.path(p, "mid", "bwd"), "ab") as f:
+                    f.write(mids[sel].tobytes())
+                with open(table.path(p, "idx", "bwd"), "ab") as f:
+                    f.write(index[sel].tobytes())
+                spilled[p] = True
+        if table.parts > 1:
+            for p in range(table.parts):
+                if not spilled[p]:
+                    continue
+                mids = np.fromfile(table.path(p, "mid", "bwd"), dtype=np.uint64)
+                index = np.fromfile(table.path(p, "idx", "bwd"), dtype=np.uint32)
+                candidates += probe(*table.load(p), mids, index)
+        stats["backward_s"] = time.perf_counter() - start
+
+        # Wrong keys that collide on one 64-bit block are dropped by the
+        # remaining known pairs
+        found = []
+        for i, j in candidates:
+            k1 = keys_from_effective([fixed1 | i]).tobytes()
+            k2 = keys_from_effective([fixed2 | j]).tobytes()
+            if all(DES.new(k2, DES.MODE_ECB).encrypt(DES.new(k1, DES.MODE_ECB).encrypt(p)) == c for p, c in rest):
+                found.append((k1, k2))
+        stats["candidates"] = len(candidates)
+        stats["table_mb"] = total * ENTRY_BYTES / table.parts / 2 ** 20
+        stats["peak_rss_mb"] = peak_rss_mb()
+        return found, stats
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Meet-in-the-middle key recovery for double DES")
+    parser.add_argument("--bits", type=int, default=16, help="unknown effective bits per key (up to 32)")
+    parser.add_argument("--memory", type=float, default=256, help="MB budget for the forward table")
+    parser.add_argument("--workdir", help="directory for spilled partitions (default: system temp)")
+    parser.add_argument("--key1", default="A1B2C3D4")
+    parser.add_argument("--key2", default="9F8E7D6C")
+    parser.add_argument("--message", default="Meet me in the middle of the night")
+    args = parser.parse_args()
+
+    ct = double_des_en(args.message, args.key1, args.key2)
+    pt = pad(args.message.encode('utf-8'), DES.block_size)
+    pairs = [(pt[i:i + 8], ct[i:i + 8]) for i in range(0, 24, 8)]
+    # Only the low --bits effective bits of each key are unknown; the bases
+    # below fix the rest
+    base1, base2 = args.key1.encode('utf-8'), args.key2.encode('utf-8')
+
+    print(f"Double DES, 2 x {args.bits} unknown key bits, memory budget {args.memory:g} MB")
+    found, stats = attack(pairs, base1, base2, args.bits, int(args.memory * 2 ** 20), args.workdir)
+    for k1, k2 in found:
+        print(f"Keys found: k1={k1!r} k2={k2!r}",
+              "(parity-equivalent to the real keys)" if (effective_bits(k1), effective_bits(k2)) ==
+              (effective_bits(base1), effective_bits(base2)) else "")
+    keys = stats["keys"]
+    print(f"Partitions: {stats['partitions']}, table per partition {stats['table_mb']:.1f} MB, "
+          f"peak RSS {stats['peak_rss_mb']:.0f} MB")
+    print(f"Forward:  {keys:,} keys in {stats['forward_s']:.2f}s ({keys / stats['forward_s']:,.0f} keys/s)")
+    print(f"Backward: {keys:,} keys in {stats['backward_s']:.2f}s ({keys / stats['backward_s']:,.0f} keys/s), "
+          f"{stats['candidates']} candidate(s)")
+    rate = 2 * keys / (stats["forward_s"] + stats["backward_s"])
+    print(f"Brute force over both keys would need {keys * keys:,} trials, ~{keys * keys / rate:,.0f}s at this rate")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import mmap
+import os
+import time
+from multiprocessing import Pool, cpu_count, shared_memory
+from Crypto.Cipher import AES, DES
+from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import pad, unpad
+from AQ5 import WINDOW, segments
+
+ALGORITHMS = {"DES": DES, "AES": AES}
+
+
+# Plaintext block i is D(C[i]) xor C[i-1], so a segment can be decrypted on
+# its own once its IV is set to the ciphertext block just before it
+def cbc_range(src, dst, algorithm, key, iv, start, end):
+    module = ALGORITHMS[algorithm]
+    if start:
+        iv = bytes(src[start - module.block_size:start])
+    cipher = module.new(key, module.MODE_CBC, iv)
+    for offset in range(start, end, WINDOW):
+        stop = min(offset + WINDOW, end)
+        cipher.decrypt(src[offset:stop], output=dst[offset:stop])
+
+
+def buffer_segment(job):
+    in_name, out_name, algorithm, key, iv, start, end = job
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        cbc_range(shm_in.buf, shm_out.buf, algorithm, key, iv, start, end)
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+def file_segment(job):
+    in_path, out_path, algorithm, key, iv, start, end = job
+    with open(in_path, "rb") as f_in, open(out_path, "r+b") as f_out:
+        with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as m_in, \
+                mmap.mmap(f_out.fileno(), 0) as m_out:
+            cbc_range(memoryview(m_in), memoryview(m_out), algorithm, key, iv, start, end)
+
+
+def check_length(size, algorithm):
+    if size == 0 or size % ALGORITHMS[algorithm].block_size:
+        raise ValueError("Ciphertext length is not a positive multiple of the block size")
+
+
+def decrypt_cbc_parallel(ct, key, iv, algorithm="AES", workers=None, strip_padding=True):
+    size = len(ct)
+    check_length(size, algorithm)
+    workers = workers or cpu_count()
+    shm_in = shared_memory.SharedMemory(create=True, size=size)
+    shm_out = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm_in.buf[:size] = ct
+        jobs = [(shm_in.name, shm_out.name, algorithm, key, iv, start, end)
+                for start, end in segments(size, workers)]
+        with Pool(workers) as pool:
+            pool.map(buffer_segment, jobs)
+        pt = bytes(shm_out.buf[:size])
+    finally:
+        for shm in (shm_in, shm_out):
+            shm.close()
+            shm.unlink()
+    return unpad(pt, ALGORITHMS[algorithm].block_size) if strip_padding else pt
+
+
+# File version: segments are written into a memory-mapped output, then the
+# padding is checked on the last block and cut off with truncate
+def decrypt_file_cbc_parallel(in_path, out_path, key, iv, algorithm="AES", workers=None):
+    size = os.path.getsize(in_path)
+    check_length(size, algorithm)
+    workers = workers or cpu_count()
+    with open(out_path, "wb") as f:
+        f.truncate(size)
+    jobs = [(in_path, out_path, algorithm, key, iv, start, end) for start, end in segments(size, workers)]
+    with Pool(workers) as pool:
+        pool.map(file_segment, jobs)
+
+    block = ALGORITHMS[algorithm].block_size
+    with open(out_path, "r+b") as f:
+        f.seek(size - block)
+        last = unpad(f.read(block), block)
+        f.truncate(size - block + len(last))
+
+
+def benchmark(size_mb=128):
+    for algorithm, key in (("DES", b"A1B2C3D4"), ("AES", b"0123456789ABCDEF0123456789ABCDEF")):
+        module = ALGORITHMS[algorithm]
+        iv = get_random_bytes(module.block_size)
+        data = os.urandom(size_mb * 1024 * 1024)
+        ct = module.new(key, module.MODE_CBC, iv).encrypt(pad(data, module.block_size))
+
+        start = time.perf_counter()
+        expected = unpad(module.new(key, module.MODE_CBC, iv).decrypt(ct), module.block_size)
+        single = time.perf_counter() - start
+        print(f"{algorithm}-CBC {size_mb} MB, single-threaded: {size_mb / single:.0f} MB/s")
+
+        for workers in range(1, cpu_count() + 1):
+            start = time.perf_counter()
+            pt = decrypt_cbc_parallel(ct, key, iv, algorithm, workers)
+            elapsed = time.perf_counter() - start
+            assert pt == expected
+            print(f"  {workers} worker(s): {size_mb / elapsed:.0f} MB/s ({single / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
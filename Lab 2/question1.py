@@ -1,8 +1,9 @@
 from Crypto.Cipher import DES
 from Crypto.Util.Padding import pad, unpad
+from cipher_cache import get_cipher
 
 def des_cipher(key):
-    return DES.new(key.encode('utf-8'), DES.MODE_ECB)
+    return get_cipher("DES", key.encode('utf-8'), DES.MODE_ECB)
 
 def des_en(ptext, key):
     cipher = des_cipher(key)
@@ -1,11 +1,10 @@
+import argparse
+import json
+import platform
 import time
 import numpy as np
 from Crypto.Cipher import AES, DES
 from Crypto.Util.Padding import pad, unpad
-from bokeh.plotting import figure, show
-from bokeh.models import HoverTool
-from bokeh.layouts import column
-from bokeh.palettes import Category10
 
 def aes_cipher(key):
     return AES.new(key.encode('utf-8'), AES.MODE_ECB)
@@ -39,69 +38,79 @@ def des_de(ctext, key):
 def des_pad_key(key):
     return key.ljust(8)[:8]
 
-def time_encryption_progressive(encrypt_func, plaintext, key, max_iterations=1000):
-    """Time encryption across different iteration counts"""
-    iteration_counts = np.logspace(1, np.log10(max_iterations), 10, dtype=int)
-    times_per_iteration = []
-
-    for iterations in iteration_counts:
-        start_time = time.time()
-        for _ in range(iterations):
-            encrypt_func(plaintext, key)
-        end_time = time.time()
-        total_time = end_time - start_time
-        times_per_iteration.append(total_time / iterations)
-
-    return iteration_counts, times_per_iteration
-
-def time_decryption_progressive(decrypt_func, ciphertext, key, max_iterations=1000):
-    """Time decryption across different iteration counts"""
-    iteration_counts = np.logspace(1, np.log10(max_iterations), 10, dtype=int)
-    times_per_iteration = []
-
-    for iterations in iteration_counts:
-        start_time = time.time()
-        for _ in range(iterations):
-            decrypt_func(ciphertext, key)
-        end_time = time.time()
-        total_time = end_time - start_time
-        times_per_iteration.append(total_time / iterations)
-
-    return iteration_counts, times_per_iteration
-
-def benchmark_ciphers(plaintext, raw_key, max_iterations=1000):
-    # Prepare keys
-    aes_key = aes256_pad_key(raw_key)
-    des_key = des_pad_key(raw_key)
-
-    # Get ciphertexts for decryption timing
-    aes_ciphertext = aes_en(plaintext, aes_key)
-    des_ciphertext = des_en(plaintext, des_key)
-
-    # Time encryption progressively
-    aes_enc_iterations, aes_enc_times = time_encryption_progressive(aes_en, plaintext, aes_key, max_iterations)
-    des_enc_iterations, des_enc_times = time_encryption_progressive(des_en, plaintext, des_key, max_iterations)
-
-    # Time decryption progressively
-    aes_dec_iterations, aes_dec_times = time_decryption_progressive(aes_de, aes_ciphertext, aes_key, max_iterations)
-    des_dec_iterations, des_dec_times = time_decryption_progressive(des_de, des_ciphertext, des_key, max_iterations)
-
-    return {
-        'aes_enc_iterations': aes_enc_iterations,
-        'aes_enc_times': aes_enc_times,
-        'des_enc_iterations': des_enc_iterations,
-        'des_enc_times': des_enc_times,
-        'aes_dec_iterations': aes_dec_iterations,
-        'aes_dec_times': aes_dec_times,
-        'des_dec_iterations': des_dec_iterations,
-        'des_dec_times': des_dec_times
-    }
-
-def create_plot(title, plaintext_length):
+CIPHERS = {
+    "AES-256": (aes_en, aes_de, aes256_pad_key),
+    "DES": (des_en, des_de, des_pad_key),
+}
+
+def parse_size(text):
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+# 16 B, 64 B, 256 B, ... up to max_size
+def payload_sizes(min_size, max_size, factor=4):
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= factor
+    return sizes
+
+def random_text(size):
+    return np.random.default_rng(size).integers(ord('a'), ord('z') + 1, size, dtype=np.uint8).tobytes().decode('ascii')
+
+# Each call is timed on its own, so p95/p99 are per-call tail latencies
+# rather than percentiles of batch means
+def measure(func, args, warmup_ns, min_samples, max_samples, budget_ns):
+    deadline = time.perf_counter_ns() + warmup_ns
+    func(*args)
+    while time.perf_counter_ns() < deadline:
+        func(*args)
+
+    samples = []
+    end = time.perf_counter_ns() + budget_ns
+    while len(samples) < min_samples or (len(samples) < max_samples and time.perf_counter_ns() < end):
+        start = time.perf_counter_ns()
+        func(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return np.array(samples)
+
+def run_benchmark(args):
+    results = []
+    for size in payload_sizes(args.min_size, args.max_size):
+        plaintext = random_text(size)
+        for name in args.algorithms:
+            encrypt, decrypt, pad_key = CIPHERS[name]
+            key = pad_key(args.key)
+            ciphertext = encrypt(plaintext, key)
+            for operation, func, data in (("encrypt", encrypt, plaintext), ("decrypt", decrypt, ciphertext)):
+                samples = measure(func, (data, key), args.warmup * 1e9,
+                                  args.min_samples, args.max_samples, args.budget * 1e9)
+                median, p95, p99 = np.percentile(samples, [50, 95, 99])
+                result = {
+                    "algorithm": name,
+                    "operation": operation,
+                    "size": size,
+                    "samples": len(samples),
+                    "median_ns": float(median),
+                    "p95_ns": float(p95),
+                    "p99_ns": float(p99),
+                    "mb_per_s": size / (median / 1e9) / (1024 * 1024),
+                }
+                results.append(result)
+                print(f"{name:>8} {operation:>7} {size:>10} B  median {median / 1e3:>12.2f} us  "
+                      f"p95 {p95 / 1e3:>12.2f} us  p99 {p99 / 1e3:>12.2f} us  {result['mb_per_s']:>9.2f} MB/s")
+    return results
+
+def create_plot(title, y_label):
+    from bokeh.plotting import figure
     return figure(
-        title=f"{title}\nPlaintext length: {plaintext_length} chars",
-        x_axis_label="Number of Iterations",
-        y_axis_label="Time per Operation (seconds)",
+        title=title,
+        x_axis_label="Payload size (bytes)",
+        y_axis_label=y_label,
         x_axis_type="log",
         y_axis_type="log",
         width=800,
@@ -114,25 +123,29 @@ def add_line_and_markers(plot, x_data, y_data, color, label):
     plot.line(x_data, y_data, line_width=3, color=color, alpha=0.8, legend_label=label)
     plot.scatter(x_data, y_data, size=8, color=color, alpha=0.8)
 
-def plot_results(results, plaintext_length):
-    colors = Category10[4]
-
-    # Create plots
-    p1 = create_plot("Encryption Performance: Time per Operation", plaintext_length)
-    p2 = create_plot("Decryption Performance: Time per Operation", plaintext_length)
-
-    # Add data to plots
-    add_line_and_markers(p1, results['aes_enc_iterations'], results['aes_enc_times'], colors[0], "AES-256 Encryption")
-    add_line_and_markers(p1, results['des_enc_iterations'], results['des_enc_times'], colors[1], "DES Encryption")
-    add_line_and_markers(p2, results['aes_dec_iterations'], results['aes_dec_times'], colors[2], "AES-256 Decryption")
-    add_line_and_markers(p2, results['des_dec_iterations'], results['des_dec_times'], colors[3], "DES Decryption")
-
-    # Add hover tools and styling
-    hover = HoverTool(tooltips=[("Algorithm", "@legend_label"), ("Iterations", "@x"), ("Time per Op", "@y{0.0000000} sec")])
+# Optional post-processing of a saved JSON report; bokeh is only needed here
+def plot_results(json_path):
+    from bokeh.plotting import show
+    from bokeh.layouts import column
+    from bokeh.palettes import Category10
+
+    with open(json_path) as f:
+        report = json.load(f)
+    series = {}
+    for r in report["results"]:
+        series.setdefault((r["algorithm"], r["operation"]), []).append(r)
+
+    p1 = create_plot("Median latency per operation", "Latency (ns)")
+    p2 = create_plot("Throughput", "MB/s")
+    colors = Category10[10]
+    for i, ((algorithm, operation), rows) in enumerate(sorted(series.items())):
+        sizes = [r["size"] for r in rows]
+        label = f"{algorithm} {operation}"
+        add_line_and_markers(p1, sizes, [r["median_ns"] for r in rows], colors[i % 10], label)
+        add_line_and_markers(p2, sizes, [r["mb_per_s"] for r in rows], colors[i % 10], label)
 
     for p in [p1, p2]:
-        p.add_tools(hover)
-        p.legend.location = "top_right"
+        p.legend.location = "top_left"
         p.legend.click_policy = "hide"
         p.legend.background_fill_alpha = 0.8
         p.grid.grid_line_alpha = 0.3
@@ -140,37 +153,33 @@ def plot_results(results, plaintext_length):
     show(column(p1, p2))
 
 def main():
-    print("AES-256 vs DES Performance Comparison")
-    print("=====================================")
-
-    plaintext = input("Enter plaintext: ")
-    key = input("Enter key: ")
-    max_iterations = int(input("Enter maximum number of iterations (default 1000): ") or "1000")
-
-    print(f"\nBenchmarking across iteration ranges up to {max_iterations}...")
-    results = benchmark_ciphers(plaintext, key, max_iterations)
-
-    # Calculate average times for comparison
-    avg_aes_enc = np.mean(results['aes_enc_times'])
-    avg_des_enc = np.mean(results['des_enc_times'])
-    avg_aes_dec = np.mean(results['aes_dec_times'])
-    avg_des_dec = np.mean(results['des_dec_times'])
-
-    print("\nAverage Results (time per operation):")
-    print(f"AES-256 Encryption: {avg_aes_enc:.8f} seconds")
-    print(f"DES Encryption:     {avg_des_enc:.8f} seconds")
-    print(f"AES-256 Decryption: {avg_aes_dec:.8f} seconds")
-    print(f"DES Decryption:     {avg_des_dec:.8f} seconds")
-
-    print("\nSpeed comparison:")
-    if avg_aes_enc < avg_des_enc:
-        ratio = avg_des_enc / avg_aes_enc
-        print(f"AES-256 encryption is {ratio:.2f}x faster than DES")
-    else:
-        ratio = avg_aes_enc / avg_des_enc
-        print(f"DES encryption is {ratio:.2f}x faster than AES-256")
-
-    plot_results(results, len(plaintext))
+    parser = argparse.ArgumentParser(description="AES-256 vs DES latency and throughput benchmark")
+    parser.add_argument("--algorithms", nargs="+", choices=list(CIPHERS), default=list(CIPHERS))
+    parser.add_argument("--key", default="benchmark-key-0123456789abcdef")
+    parser.add_argument("--min-size", type=parse_size, default=16)
+    parser.add_argument("--max-size", type=parse_size, default=parse_size("64M"))
+    parser.add_argument("--warmup", type=float, default=0.05, help="warmup seconds per measurement")
+    parser.add_argument("--min-samples", type=int, default=10)
+    parser.add_argument("--max-samples", type=int, default=1000)
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds of sampling per measurement")
+    parser.add_argument("--json", default="cipher_benchmark.json", help="where to write the report")
+    parser.add_argument("--plot", metavar="JSON", help="plot a saved report with bokeh and exit")
+    args = parser.parse_args()
+
+    if args.plot:
+        plot_results(args.plot)
+        return
+
+    results = run_benchmark(args)
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "plot"},
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.json, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.json}")
 
 if __name__ == '__main__':
     main()
@@ -1,8 +1,9 @@
 from Crypto.Cipher import DES3
 from Crypto.Util.Padding import pad, unpad
+from cipher_cache import get_cipher
 
 def des3_cipher(key):
-    return DES3.new(key.encode('utf-8'), DES3.MODE_ECB)
+    return get_cipher("DES3", key.encode('utf-8'), DES3.MODE_ECB)
 
 def des3_en(ptext, key):
     cipher = des3_cipher(key)
@@ -1,8 +1,9 @@
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
+from cipher_cache import get_cipher
 
 def aes_cipher(key):
-    return AES.new(key.encode('utf-8'), AES.MODE_ECB)
+    return get_cipher("AES", key.encode('utf-8'), AES.MODE_ECB)
 
 def aes_en(ptext, key):
     cipher = aes_cipher(key)
@@ -0,0 +1,240 @@
+# Pure-Python DES and AES with the ECB/CBC/CFB/OFB/CTR modes used in AQ1.py.
+# Far slower than pycryptodome; it exists as a readable reference backend for
+# cipher_registry and produces the same output as DES.new/AES.new.
+
+IP = [58, 50, 42, 34, 26, 18, 10, 2, 60, 52, 44, 36, 28, 20, 12, 4,
+      62, 54, 46, 38, 30, 22, 14, 6, 64, 56, 48, 40, 32, 24, 16, 8,
+      57, 49, 41, 33, 25, 17, 9, 1, 59, 51, 43, 35, 27, 19, 11, 3,
+      61, 53, 45, 37, 29, 21, 13, 5, 63, 55, 47, 39, 31, 23, 15, 7]
+FP = [IP.index(i) + 1 for i in range(1, 65)]
+E = [32, 1, 2, 3, 4, 5, 4, 5, 6, 7, 8, 9, 8, 9, 10, 11, 12, 13, 12, 13, 14, 15, 16, 17,
+     16, 17, 18, 19, 20, 21, 20, 21, 22, 23, 24, 25, 24, 25, 26, 27, 28, 29, 28, 29, 30, 31, 32, 1]
+P = [16, 7, 20, 21, 29, 12, 28, 17, 1, 15, 23, 26, 5, 18, 31, 10,
+     2, 8, 24, 14, 32, 27, 3, 9, 19, 13, 30, 6, 22, 11, 4, 25]
+PC1 = [57, 49, 41, 33, 25, 17, 9, 1, 58, 50, 42, 34, 26, 18, 10, 2, 59, 51, 43, 35, 27, 19, 11, 3,
+       60, 52, 44, 36, 63, 55, 47, 39, 31, 23, 15, 7, 62, 54, 46, 38, 30, 22, 14, 6,
+       61, 53, 45, 37, 29, 21, 13, 5, 28, 20, 12, 4]
+PC2 = [14, 17, 11, 24, 1, 5, 3, 28, 15, 6, 21, 10, 23, 19, 12, 4, 26, 8, 16, 7, 27, 20, 13, 2,
+       41, 52, 31, 37, 47, 55, 30, 40, 51, 45, 33, 48, 44, 49, 39, 56, 34, 53, 46, 42, 50, 36, 29, 32]
+SHIFTS = [1, 1, 2, 2, 2, 2, 2, 2, 1, 2, 2, 2, 2, 2, 2, 1]
+SBOXES = [
+    [14, 4, 13, 1, 2, 15, 11, 8, 3, 10, 6, 12, 5, 9, 0, 7, 0, 15, 7, 4, 14, 2, 13, 1, 10, 6, 12, 11, 9, 5, 3, 8,
+     4, 1, 14, 8, 13, 6, 2, 11, 15, 12, 9, 7, 3, 10, 5, 0, 15, 12, 8, 2, 4, 9, 1, 7, 5, 11, 3, 14, 10, 0, 6, 13],
+    [15, 1, 8, 14, 6, 11, 3, 4, 9, 7, 2, 13, 12, 0, 5, 10, 3, 13, 4, 7, 15, 2, 8, 14, 12, 0, 1, 10, 6, 9, 11, 5,
+     0, 14, 7, 11, 10, 4, 13, 1, 5, 8, 12, 6, 9, 3, 2, 15, 13, 8, 10, 1, 3, 15, 4, 2, 11, 6, 7, 12, 0, 5, 14, 9],
+    [10, 0, 9, 14, 6, 3, 15, 5, 1, 13, 12, 7, 11, 4, 2, 8, 13, 7, 0, 9, 3, 4, 6, 10, 2, 8, 5, 14, 12, 11, 15, 1,
+     13, 6, 4, 9, 8, 15, 3, 0, 11, 1, 2, 12, 5, 10, 14, 7, 1, 10, 13, 0, 6, 9, 8, 7, 4, 15, 14, 3, 11, 5, 2, 12],
+    [7, 13, 14, 3, 0, 6, 9, 10, 1, 2, 8, 5, 11, 12, 4, 15, 13, 8, 11, 5, 6, 15, 0, 3, 4, 7, 2, 12, 1, 10, 14, 9,
+     10, 6, 9, 0, 12, 11, 7, 13, 15, 1, 3, 14, 5, 2, 8, 4, 3, 15, 0, 6, 10, 1, 13, 8, 9, 4, 5, 11, 12, 7, 2, 14],
+    [2, 12, 4, 1, 7, 10, 11, 6, 8, 5, 3, 15, 13, 0, 14, 9, 14, 11, 2, 12, 4, 7, 13, 1, 5, 0, 15, 10, 3, 9, 8, 6,
+     4, 2, 1, 11, 10, 13, 7, 8, 15, 9, 12, 5, 6, 3, 0, 14, 11, 8, 12, 7, 1, 14, 2, 13, 6, 15, 0, 9, 10, 4, 5, 3],
+    [12, 1, 10, 15, 9, 2, 6, 8, 0, 13, 3, 4, 14, 7, 5, 11, 10, 15, 4, 2, 7, 12, 9, 5, 6, 1, 13, 14, 0, 11, 3, 8,
+     9, 14, 15, 5, 2, 8, 12, 3, 7, 0, 4, 10, 1, 13, 11, 6, 4, 3, 2, 12, 9, 5, 15, 10, 11, 14, 1, 7, 6, 0, 8, 13],
+    [4, 11, 2, 14, 15, 0, 8, 13, 3, 12, 9, 7, 5, 10, 6, 1, 13, 0, 11, 7, 4, 9, 1, 10, 14, 3, 5, 12, 2, 15, 8, 6,
+     1, 4, 11, 13, 12, 3, 7, 14, 10, 15, 6, 8, 0, 5, 9, 2, 6, 11, 13, 8, 1, 4, 10, 7, 9, 5, 0, 15, 14, 2, 3, 12],
+    [13, 2, 8, 4, 6, 15, 11, 1, 10, 9, 3, 14, 5, 0, 12, 7, 1, 15, 13, 8, 10, 3, 7, 4, 12, 5, 6, 11, 0, 14, 9, 2,
+     7, 11, 4, 1, 9, 12, 14, 2, 0, 6, 10, 13, 15, 3, 5, 8, 2, 1, 14, 7, 4, 10, 8, 13, 15, 12, 9, 0, 3, 5, 6, 11],
+]
+
+def permute(value, table, width):
+    out = 0
+    for pos in table:
+        out = (out << 1) | ((value >> (width - pos)) & 1)
+    return out
+
+class DESBlock:
+    block_size = 8
+
+    def __init__(self, key):
+        if len(key) != 8:
+            raise ValueError("DES key must be 8 bytes")
+        cd = permute(int.from_bytes(key, "big"), PC1, 64)
+        c, d = cd >> 28, cd & 0xFFFFFFF
+        self.subkeys = []
+        for shift in SHIFTS:
+            c = ((c << shift) | (c >> (28 - shift))) & 0xFFFFFFF
+            d = ((d << shift) | (d >> (28 - shift))) & 0xFFFFFFF
+            self.subkeys.append(permute((c << 28) | d, PC2, 56))
+
+    def feistel(self, right, subkey):
+        x = permute(right, E, 32) ^ subkey
+        out = 0
+        for i in range(8):
+            b = (x >> (42 - 6 * i)) & 0x3F
+            out = (out << 4) | SBOXES[i][((b >> 4) & 2 | b & 1) * 16 + ((b >> 1) & 0xF)]
+        return permute(out, P, 32)
+
+    def crypt(self, block, subkeys):
+        value = permute(int.from_bytes(block, "big"), IP, 64)
+        left, right = value >> 32, value & 0xFFFFFFFF
+        for subkey in subkeys:
+            left, right = right, left ^ self.feistel(right, subkey)
+        return permute((right << 32) | left, FP, 64).to_bytes(8, "big")
+
+    def encrypt_block(self, block):
+        return self.crypt(block, self.subkeys)
+
+    def decrypt_block(self, block):
+        return self.crypt(block, self.subkeys[::-1])
+
+
+def xtime(a):
+    a <<= 1
+    return (a ^ 0x1B) & 0xFF if a & 0x100 else a
+
+def gmul(a, b):
+    out = 0
+    while b:
+        if b & 1:
+            out ^= a
+        a = xtime(a)
+        b >>= 1
+    return out
+
+def rotl8(x, n):
+    return ((x << n) | (x >> (8 - n))) & 0xFF
+
+# S-box from the multiplicative inverse in GF(2^8) and the affine map, walking
+# p and its inverse q through the powers of 3
+def build_sbox():
+    sbox = [0x63] * 256
+    p = q = 1
+    while True:
+        p = p ^ xtime(p)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        sbox[p] = q ^ rotl8(q, 1) ^ rotl8(q, 2) ^ rotl8(q, 3) ^ rotl8(q, 4) ^ 0x63
+        if p == 1:
+            return sbox
+
+SBOX = build_sbox()
+INV_SBOX = [SBOX.index(i) for i in range(256)]
+
+class AESBlock:
+    block_size = 16
+
+    def __init__(self, key):
+        if len(key) not in (16, 24, 32):
+            raise ValueError("AES key must be 16, 24 or 32 bytes")
+        nk = len(key) // 4
+        self.rounds = nk + 6
+        words = [list(key[4 * i:4 * i + 4]) for i in range(nk)]
+        rcon = 1
+        for i in range(nk, 4 * (self.rounds + 1)):
+            temp = list(words[-1])
+            if i % nk == 0:
+                temp = [SBOX[b] for b in temp[1:] + temp[:1]]
+                temp[0] ^= rcon
+                rcon = xtime(rcon)
+            elif nk > 6 and i % nk == 4:
+                temp = [SBOX[b] for b in temp]
+            words.append([a ^ b for a, b in zip(words[i - nk], temp)])
+        self.round_keys = [sum(words[4 * r:4 * r + 4], []) for r in range(self.rounds + 1)]
+
+    def encrypt_block(self, block):
+        s = [a ^ b for a, b in zip(block, self.round_keys[0])]
+        for r in range(1, self.rounds + 1):
+            s = [SBOX[s[(i + 4 * (i % 4)) % 16]] for i in range(16)]
+            if r != self.rounds:
+                mixed = []
+                for c in range(4):
+                    a = s[4 * c:4 * c + 4]
+                    t = a[0] ^ a[1] ^ a[2] ^ a[3]
+                    mixed += [a[i] ^ t ^ xtime(a[i] ^ a[(i + 1) % 4]) for i in range(4)]
+                s = mixed
+            s = [a ^ b for a, b in zip(s, self.round_keys[r])]
+        return bytes(s)
+
+    def decrypt_block(self, block):
+        s = [a ^ b for a, b in zip(block, self.round_keys[self.rounds])]
+        for r in range(self.rounds - 1, -1, -1):
+            s = [INV_SBOX[s[(i - 4 * (i % 4)) % 16]] for i in range(16)]
+            s = [a ^ b for a, b in zip(s, self.round_keys[r])]
+            if r:
+                mixed = []
+                for c in range(4):
+                    a = s[4 * c:4 * c + 4]
+                    mixed += [gmul(a[i], 14) ^ gmul(a[(i + 1) % 4], 11) ^ gmul(a[(i + 2) % 4], 13) ^
+                              gmul(a[(i + 3) % 4], 9) for i in range(4)]
+                s = mixed
+        return bytes(s)
+
+
+def xor(a, b):
+    return bytes(x ^ y for x, y in zip(a, b))
+
+# Mode wrapper with the pycryptodome calling convention: stateful
+# encrypt()/decrypt(), CFB with 8-bit segments, CTR as nonce || counter
+class ReferenceCipher:
+    def __init__(self, block, mode_name, iv=None):
+        self.block = block
+        self.block_size = block.block_size
+        self.mode = mode_name
+        if mode_name == "CTR":
+            self.nonce = iv
+            self.counter = 0
+        elif mode_name != "ECB":
+            self.register = bytes(iv)
+        self.keystream = b""
+
+    def next_block(self):
+        if self.mode == "OFB":
+            self.register = self.block.encrypt_block(self.register)
+            return self.register
+        width = self.block_size - len(self.nonce)
+        counter = self.nonce + self.counter.to_bytes(width, "big")
+        self.counter += 1
+        return self.block.encrypt_block(counter)
+
+    def stream(self, data):
+        while len(self.keystream) < len(data):
+            self.keystream += self.next_block()
+        out = xor(data, self.keystream)
+        self.keystream = self.keystream[len(data):]
+        return out
+
+    def blocks(self, data):
+        if len(data) % self.block_size:
+            raise ValueError(f"Data must be aligned to block boundary in {self.mode} mode")
+        return [bytes(data[i:i + self.block_size]) for i in range(0, len(data), self.block_size)]
+
+    def encrypt(self, data):
+        data = bytes(data)
+        if self.mode == "ECB":
+            return b"".join(self.block.encrypt_block(b) for b in self.blocks(data))
+        if self.mode == "CBC":
+            out = []
+            for b in self.blocks(data):
+                self.register = self.block.encrypt_block(xor(b, self.register))
+                out.append(self.register)
+            return b"".join(out)
+        if self.mode == "CFB":
+            out = bytearray()
+            for byte in data:
+                c = byte ^ self.block.encrypt_block(self.register)[0]
+                self.register = self.register[1:] + bytes([c])
+                out.append(c)
+            return bytes(out)
+        return self.stream(data)
+
+    def decrypt(self, data):
+        data = bytes(data)
+        if self.mode == "ECB":
+            return b"".join(self.block.decrypt_block(b) for b in self.blocks(data))
+        if self.mode == "CBC":
+            out = []
+            for b in self.blocks(data):
+                out.append(xor(self.block.decrypt_block(b), self.register))
+                self.register = b
+            return b"".join(out)
+        if self.mode == "CFB":
+            out = bytearray()
+            for c in data:
+                out.append(c ^ self.block.encrypt_block(self.register)[0])
+                self.register = self.register[1:] + bytes([c])
+            return bytes(out)
+        return self.stream(data)